@@ -0,0 +1,130 @@
+#Python Script for the analytics cube behind the data_analysis charts
+#One pass over the prepared track batches builds small deduplicated summary tables (artist x genre, artist, album),
+#so averages count every track once instead of once per genre and credited artist row. The cube is persisted in
+#data/cache/analytics, keyed by the source files and genres, and every chart of data_analysis.py reads from it.
+#Can be ran individually to (re)build the cube.
+
+#Import necessary libraries
+import os
+import json
+import pandas as pd
+from data_processing import read_table, iter_prepared_data, TRACK_CHUNK_SIZE
+from catalogue_cache import source_hash
+from instrumentation import instrumented
+
+CUBE_DIR = 'data/cache/analytics'
+CUBE_VERSION = 1  # Bump when the cube tables change
+CUBE_TABLES = ['artist_genres', 'artists', 'albums']
+
+TRACK_FACTS = ['Track ID', 'Track Name', 'Album ID', 'Album Name', 'Track Popularity', 'Artist ID']
+ARTIST_FACTS = ['Artist ID', 'Artist Name', 'Genres', 'Followers', 'Artist Popularity']
+# Read back as text, names such as "2002" stay strings
+TEXT_COLUMNS = {column: str for column in ['Artist ID', 'Artist Name', 'Genre', 'Album ID', 'Album Name', 'Top Track', 'Top Track Album']}
+
+
+# Batches deduplicated again across batches (a track repeats in later batches under another Genre Queried)
+def _concat_unique(frames, subset):
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    return pd.concat(frames, ignore_index=True).drop_duplicates(subset, ignore_index=True)
+
+
+@instrumented
+def build_analytics_cube(prepared):
+    """
+    Aggregates prepared track rows into the summary tables of the charts.
+
+    Parameters:
+    - prepared (DataFrame or iterable): Output of clean_and_prepare_data, or its batches (iter_prepared_data).
+
+    Returns:
+    - cube (dict):
+      - 'artist_genres': One row per (artist, genre): Artist ID, Artist Name, Genre, Followers, Artist Popularity.
+      - 'artists': One row per artist: followers, popularity, number of tracks, average track popularity and top track.
+      - 'albums': One row per album: Album ID, Album Name, number of tracks and average track popularity.
+    """
+    if isinstance(prepared, pd.DataFrame):
+        prepared = [prepared]
+
+    # The single scan: each batch is reduced to unique (track, artist) and (artist, genre) facts
+    track_facts, artist_facts = [], []
+    for chunk in prepared:
+        track_facts.append(chunk[TRACK_FACTS].drop_duplicates(['Track ID', 'Artist ID']))
+        artist_facts.append(chunk[ARTIST_FACTS].drop_duplicates(['Artist ID', 'Genres']))
+    tracks = _concat_unique(track_facts, ['Track ID', 'Artist ID'])
+    artist_genres = _concat_unique(artist_facts, ['Artist ID', 'Genres']).rename(columns={'Genres': 'Genre'})
+
+    # Artists: their tracks counted once, and the most popular one
+    per_artist = tracks.groupby('Artist ID', sort=False).agg(**{
+        'Tracks': ('Track ID', 'size'),
+        'Average Track Popularity': ('Track Popularity', 'mean'),
+    })
+    rated = tracks.dropna(subset=['Track Popularity'])
+    top_tracks = rated.loc[rated.groupby('Artist ID', sort=False)['Track Popularity'].idxmax(),
+                           ['Artist ID', 'Track Name', 'Album Name', 'Track Popularity']]
+    top_tracks.columns = ['Artist ID', 'Top Track', 'Top Track Album', 'Top Track Popularity']
+    artists = (artist_genres.drop_duplicates('Artist ID')[['Artist ID', 'Artist Name', 'Followers', 'Artist Popularity']]
+               .merge(per_artist, left_on='Artist ID', right_index=True)
+               .merge(top_tracks, on='Artist ID', how='left')
+               .reset_index(drop=True))
+
+    # Albums: a track credited to several artists counts once
+    albums = (tracks.drop_duplicates('Track ID').groupby(['Album ID', 'Album Name'], sort=False)
+              .agg(**{'Tracks': ('Track ID', 'size'), 'Average Track Popularity': ('Track Popularity', 'mean')})
+              .reset_index())
+    return {'artist_genres': artist_genres, 'artists': artists, 'albums': albums}
+
+
+def save_analytics_cube(cube, cube_dir=CUBE_DIR, manifest=None):
+    os.makedirs(cube_dir, exist_ok=True)
+    manifest_path = os.path.join(cube_dir, 'manifest.json')
+    # The manifest is written last, so a half-written cube is never picked up
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    for name in CUBE_TABLES:
+        cube[name].to_csv(os.path.join(cube_dir, f'{name}.csv'), index=False)
+    with open(manifest_path, 'w') as f:
+        json.dump({**(manifest or {}), 'rows': {name: len(cube[name]) for name in CUBE_TABLES}}, f, indent=2)
+
+
+def load_analytics_cube(cube_dir=CUBE_DIR):
+    return {
+        name: pd.read_csv(os.path.join(cube_dir, f'{name}.csv'), dtype=TEXT_COLUMNS, float_precision='round_trip')
+        for name in CUBE_TABLES
+    }
+
+
+def load_or_build_analytics_cube(artists_file, tracks_file, genres_list, cube_dir=CUBE_DIR, chunk_size=TRACK_CHUNK_SIZE):
+    """
+    Loads the analytics cube, rebuilding it with one pass over the data when the source files or genres changed.
+
+    Parameters:
+    - artists_file (str): Path to all_artists_data.csv (or a Parquet file).
+    - tracks_file (str): Path to all_tracks_data.csv (or a Parquet file).
+    - genres_list (list): Genres kept by clean_and_prepare_data.
+    - cube_dir (str): Directory of the cube files (default is data/cache/analytics).
+    - chunk_size (int): Track rows per batch of the build.
+
+    Returns:
+    - cube (dict): Tables returned by build_analytics_cube.
+    """
+    manifest = {'version': CUBE_VERSION, 'source_hash': source_hash(artists_file, tracks_file), 'genres': list(genres_list)}
+    manifest_path = os.path.join(cube_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            stored = json.load(f)
+        if all(stored.get(key) == value for key, value in manifest.items()):
+            return load_analytics_cube(cube_dir)
+
+    cube = build_analytics_cube(iter_prepared_data(read_table(artists_file), tracks_file, genres_list, chunk_size))
+    save_analytics_cube(cube, cube_dir, manifest)
+    return cube
+
+
+# Run the script
+if __name__ == "__main__":
+    genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+                   'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+                   'trot', 'k-pop ballad', 'korean soundtrack']
+    cube = load_or_build_analytics_cube('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    print(f"Analytics cube in {CUBE_DIR}: " + ', '.join(f'{len(cube[name])} {name}' for name in CUBE_TABLES))
@@ -0,0 +1,135 @@
+#Python Script for the approximate nearest-neighbour (ANN) index over track feature vectors
+#Random-projection LSH in pure NumPy: each table hashes a vector to the sign pattern of n_bits random
+#hyperplanes, a query scores only the tracks in its buckets (plus multi-probe neighbours) with exact cosine.
+#More tables / probes -> higher recall and latency, more bits -> smaller buckets, lower latency and recall.
+
+#Import necessary libraries
+import argparse
+import numpy as np
+from neighbour_table import index_fingerprint
+
+# Default recall/latency trade-off
+N_TABLES = 8
+N_BITS = 10
+N_PROBES = 2
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+def build_ann_index(vectors, n_tables=N_TABLES, n_bits=N_BITS, seed=42):
+    """
+    Builds the LSH index.
+
+    Parameters:
+    - vectors (array or sparse matrix): One feature vector per dense track ID (e.g. index['features']).
+    - n_tables (int): Number of hash tables (default is 8).
+    - n_bits (int): Hyperplanes per table, buckets per table = 2 ** n_bits (default is 10).
+    - seed (int): Random seed for the hyperplanes.
+
+    Returns:
+    - ann (dict): L2-normalised float32 vectors, hyperplanes and per-table bucket codes sorted with their track IDs.
+    """
+    vectors = vectors.toarray() if hasattr(vectors, 'toarray') else np.asarray(vectors)
+    vectors = vectors.astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((n_tables, n_bits, vectors.shape[1])).astype(np.float32)
+    powers = (1 << np.arange(n_bits)).astype(np.int64)
+    
+    codes = np.stack([((vectors @ table_planes.T) > 0) @ powers for table_planes in planes])
+    orders = np.argsort(codes, axis=1, kind='stable')
+    return {
+        'vectors': vectors,
+        'planes': planes,
+        'sorted_codes': np.take_along_axis(codes, orders, axis=1),
+        'orders': orders,
+    }
+
+
+# The file stores the fingerprint of the index it was built from, its rows are dense track IDs of that catalogue
+def save_ann_index(ann, path, index):
+    np.savez(path, fingerprint=np.array(index_fingerprint(index)), **ann)
+
+
+def load_ann_index(path, index):
+    """
+    Loads a saved LSH index for the given track index.
+
+    Parameters:
+    - path (str): File written by save_ann_index.
+    - index (dict): Index returned by build_track_index, the catalogue the LSH index is used with.
+
+    Returns:
+    - ann (dict): The LSH index, see build_ann_index.
+    """
+    with np.load(path) as data:
+        ann = {name: data[name] for name in data.files}
+    fingerprint = str(ann.pop('fingerprint', ''))
+    if fingerprint != index_fingerprint(index):
+        raise ValueError(f"{path} was built for another catalogue, rebuild it with python ann_index.py")
+    return ann
+
+
+# Tracks in the query's bucket of every table, plus buckets one bit-flip away on the least certain bits
+def _candidates(ann, query, n_probes):
+    powers = (1 << np.arange(ann['planes'].shape[1])).astype(np.int64)
+    buckets = []
+    for table, table_planes in enumerate(ann['planes']):
+        projections = table_planes @ query
+        code = int((projections > 0) @ powers)
+        probes = [code] + [code ^ int(powers[bit]) for bit in np.argsort(np.abs(projections))[:n_probes]]
+        for probe in probes:
+            start, stop = np.searchsorted(ann['sorted_codes'][table], [probe, probe + 1])
+            buckets.append(ann['orders'][table][start:stop])
+    return np.unique(np.concatenate(buckets))
+
+
+def ann_search(ann, query_tracks, top_n=10, n_probes=N_PROBES, exclude=None):
+    """
+    Approximate top-n neighbours of indexed tracks by cosine similarity.
+
+    Parameters:
+    - ann (dict): Index from build_ann_index.
+    - query_tracks (array): Dense track IDs to find neighbours for.
+    - top_n (int): Number of neighbours per query (default is 10).
+    - n_probes (int): Extra buckets probed per table (default is 2), higher = better recall, slower.
+    - exclude (list): Per query, dense track IDs that must not be returned (optional).
+
+    Returns:
+    - neighbours (array): Dense track IDs, one row per query, most similar first, ties in track ID order.
+      Rows are padded with -1 when the buckets hold fewer than top_n candidates.
+    """
+    neighbours = np.full((len(query_tracks), top_n), -1, dtype=np.intp)
+    for row, track in enumerate(query_tracks):
+        query = ann['vectors'][track]
+        candidates = _candidates(ann, query, n_probes)
+        if exclude is not None:
+            candidates = candidates[~np.isin(candidates, exclude[row])]
+        
+        # Exact cosine on the candidates only, ties in track ID order
+        scores = ann['vectors'][candidates] @ query
+        top = candidates[np.lexsort((candidates, -scores))[:top_n]]
+        neighbours[row, :len(top)] = top
+    return neighbours
+
+
+# Run the script: build the index for the cached catalogue and save it
+if __name__ == "__main__":
+    from catalogue_cache import load_or_build_catalogue
+    from catalogue import build_catalogue
+    from recommendation_system import build_track_index
+    
+    parser = argparse.ArgumentParser(description='Build the LSH index for content similarity.')
+    parser.add_argument('--output', default='data/cache/ann_index.npz')
+    parser.add_argument('--tables', type=int, default=N_TABLES)
+    parser.add_argument('--bits', type=int, default=N_BITS)
+    args = parser.parse_args()
+    
+    df = load_or_build_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    index = build_track_index(build_catalogue(df, genres_list))
+    save_ann_index(build_ann_index(index['features'], args.tables, args.bits), args.output, index)
+    print(f"Saved LSH index ({args.tables} tables x {args.bits} bits) for {index['features'].shape[0]} tracks to {args.output}")
@@ -0,0 +1,347 @@
+#Python Script for the headless recommendation HTTP service
+#Loads the catalogue once and serves JSON over a small asyncio HTTP/1.1 server (keep-alive, no extra dependencies).
+#Content and hybrid requests are scored off the event loop. Requests of one endpoint arriving within a few
+#milliseconds are scored together in one vectorized pass.
+#Usage: python api_server.py --port 8000
+#
+#Endpoints:
+#- GET  /popularity?genre=k-pop&top_n=10
+#- POST /content  {"tracks": ["Who"], "preferred_genres": ["k-pop"], "top_n": 10}
+#- POST /hybrid   {"tracks": ["Who"], "preferred_genres": ["trot"], "top_n": 10}
+#- GET  /metrics  Latency histograms per endpoint, plus per-stage histograms when KPOP_INSTRUMENTATION is set
+#Popularity leaderboards pick up new crawl partitions (data_retrieve.py) every REFRESH_INTERVAL_S seconds.
+
+#Import necessary libraries
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+from urllib.parse import urlsplit, parse_qs
+import instrumentation
+from instrumentation import LatencyHistogram
+from catalogue_cache import load_or_build_catalogue
+from catalogue import build_catalogue, tracks_for_names
+from popularity_leaderboard import build_leaderboards, CrawlRefresher
+from neighbour_table import open_neighbour_tables
+from recommendation_system import build_track_index, similar_tracks_batch, hybrid_scores_batch, rank_content_recommendations
+
+# Server settings
+HOST = '127.0.0.1'
+PORT = 8000
+BATCH_WINDOW_MS = 2  # How long the first request of a batch waits for others
+MAX_BATCH_SIZE = 64
+MAX_TOP_N = 100
+REFRESH_INTERVAL_S = 60  # How often new crawl partitions are merged into the leaderboards
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# Bad request raised by the handlers, answered with status 400
+class BadRequest(Exception):
+    pass
+
+
+# Plain JSON records, NaN -> None, numpy scalars -> Python
+def _records(frame):
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+# Collects requests for a few milliseconds and scores them in one call of score_batch, off the event loop
+class MicroBatcher:
+    def __init__(self, score_batch, window_ms=BATCH_WINDOW_MS, max_batch_size=MAX_BATCH_SIZE):
+        self.score_batch = score_batch
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.queue = asyncio.Queue()
+        self.batch_sizes = LatencyHistogram(buckets=[1, 2, 4, 8, 16, 32, 64, 128])
+
+    async def submit(self, *request):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batch_sizes.observe(len(batch))
+            try:
+                # Score off the event loop so new requests keep queueing up for the next batch
+                results = await loop.run_in_executor(None, self.score_batch, [request for request, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    # A request that failed on its own gets its exception, the rest of the batch its results
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class RecommendationService:
+    """
+    Recommendation endpoints backed by recommendation_system.py, with the catalogue loaded once.
+
+    Parameters:
+    - artists_file (str): Path to all_artists_data.csv.
+    - tracks_file (str): Path to all_tracks_data.csv.
+    - genres (list): Genres used by the recommenders.
+    """
+    def __init__(self, artists_file='data/all_artists_data.csv', tracks_file='data/all_tracks_data.csv', genres=genres_list):
+        self.genres = list(genres)
+        self.df = load_or_build_catalogue(artists_file, tracks_file, self.genres)
+        self.catalogue = build_catalogue(self.df, self.genres)
+        self.index = build_track_index(self.catalogue)
+        self.leaderboards = build_leaderboards(self.df, self.genres)
+        self.refresher = CrawlRefresher(self.leaderboards, artists_file, self.genres)
+        self.related = open_neighbour_tables(self.index)
+
+        # Response records prepared once: per dense track ID, and the leaderboards per genre
+        track_columns = ['Track ID', 'Track Name', 'Artist Name', 'Album Name', 'Track Image', 'Track Popularity']
+        self.track_records = _records(self.df.iloc[self.catalogue['track_rows']][track_columns])
+        self.popular_records = self._popular_records()
+
+        self.batcher = None
+        self.hybrid_batcher = None
+        self.latency = {}
+
+    def _popular_records(self):
+        return {
+            genre: {name: _records(board.iloc[:MAX_TOP_N]) for name, board in boards.items()}
+            for genre, boards in self.leaderboards.items()
+        }
+
+    # Merge new crawl partitions into the leaderboards, the records are swapped in once ready
+    def refresh_leaderboards(self):
+        rows = self.refresher.refresh()
+        if rows:
+            self.popular_records = self._popular_records()
+        return rows
+
+    # Recommendations per request of a batch, or the exception raised while scoring that request
+    def score_content_batch(self, batch):
+        seed_lists = [seeds for seeds, _, _ in batch]
+        top_n = max(request_top_n for _, _, request_top_n in batch)
+        try:
+            neighbours = similar_tracks_batch(self.index, seed_lists, top_n, related=self.related)
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            # Score the requests one by one, so only the one that fails gets the error
+            return [self.score_content_batch([request])[0] for request in batch]
+        
+        results = []
+        for rows, (_, preferred_genres, request_top_n) in zip(neighbours, batch):
+            try:
+                results.append(rank_content_recommendations(self.catalogue, rows[:, :request_top_n], preferred_genres, request_top_n))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _parse_top_n(self, value):
+        try:
+            top_n = int(value)
+        except (TypeError, ValueError):
+            raise BadRequest('top_n must be an integer')
+        if not 1 <= top_n <= MAX_TOP_N:
+            raise BadRequest(f'top_n must be between 1 and {MAX_TOP_N}')
+        return top_n
+
+    def _parse_body(self, body):
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise BadRequest('body must be JSON')
+        tracks = request.get('tracks') or []
+        preferred_genres = request.get('preferred_genres') or []
+        if not isinstance(tracks, list) or not isinstance(preferred_genres, list):
+            raise BadRequest('tracks and preferred_genres must be lists')
+        if not all(isinstance(value, str) for value in tracks + preferred_genres):
+            raise BadRequest('tracks and preferred_genres must be lists of strings')
+        return tracks, preferred_genres, self._parse_top_n(request.get('top_n', 10))
+
+    def popularity(self, query):
+        genre = query.get('genre', [None])[0]
+        top_n = self._parse_top_n(query.get('top_n', [10])[0])
+        if genre not in self.popular_records:
+            raise BadRequest(f'unknown genre: {genre}')
+        return {name: records[:top_n] for name, records in self.popular_records[genre].items()}
+
+    async def content(self, body):
+        tracks, preferred_genres, top_n = self._parse_body(body)
+        seeds = tracks_for_names(self.catalogue, tracks)
+        recommendations = await self.batcher.submit(seeds, preferred_genres, top_n) if len(seeds) else []
+        return {'tracks': [self.track_records[track] for track in recommendations]}
+
+    # Popularity and content similarity fused per track, ranked per genre (see hybrid_recommendation_system).
+    # The seed rows of a whole batch are scored in one sparse product and every (request, genre) row in one top-k pass.
+    def score_hybrid_batch(self, batch):
+        top_n = max(request_top_n for _, _, request_top_n in batch)
+        try:
+            ranked = hybrid_scores_batch(self.index, [seeds for seeds, _, _ in batch], [genres for _, genres, _ in batch], top_n)
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            # Score the requests one by one, so only the one that fails gets the error
+            return [self.score_hybrid_batch([request])[0] for request in batch]
+
+        results = []
+        for (tracks, scores), (_, genres, request_top_n) in zip(ranked, batch):
+            results.append({
+                genre: [
+                    {**self.track_records[track], 'Hybrid Score': score}
+                    for track, score in zip(genre_tracks[:request_top_n].tolist(), genre_scores[:request_top_n].tolist()) if score > -np.inf
+                ]
+                for genre, genre_tracks, genre_scores in zip(genres, tracks, scores)
+            })
+        return results
+
+    async def hybrid(self, body):
+        tracks, preferred_genres, top_n = self._parse_body(body)
+        if not tracks and not preferred_genres:
+            raise BadRequest('give at least one track or preferred genre')
+        genres = preferred_genres or self.genres
+        return await self.hybrid_batcher.submit(tracks_for_names(self.catalogue, tracks), genres, top_n)
+
+    def metrics(self):
+        return {
+            'latency': {endpoint: histogram.snapshot() for endpoint, histogram in self.latency.items()},
+            'content_batch_size': self.batcher.batch_sizes.snapshot() if self.batcher else None,
+            'hybrid_batch_size': self.hybrid_batcher.batch_sizes.snapshot() if self.hybrid_batcher else None,
+            'stages': instrumentation.snapshot() if instrumentation.ENABLED else None,
+        }
+
+    def dispatch(self, method, target):
+        url = urlsplit(target)
+        route = (method, url.path)
+        if route == ('GET', '/popularity'):
+            return lambda body: self.popularity(parse_qs(url.query))
+        if route == ('POST', '/content'):
+            return self.content
+        if route == ('POST', '/hybrid'):
+            return self.hybrid
+        if route == ('GET', '/metrics'):
+            return lambda body: self.metrics()
+        return None
+
+    async def handle(self, method, target, body):
+        start = time.perf_counter()
+        handler = self.dispatch(method, target)
+        if handler is None:
+            return 404, {'error': f'no route for {method} {urlsplit(target).path}'}
+        try:
+            result = handler(body)
+            if asyncio.iscoroutine(result):
+                result = await result
+            status = 200
+        except BadRequest as e:
+            status, result = 400, {'error': str(e)}
+        except Exception as e:
+            status, result = 500, {'error': f'{type(e).__name__}: {e}'}
+
+        endpoint = urlsplit(target).path
+        self.latency.setdefault(endpoint, LatencyHistogram()).observe((time.perf_counter() - start) * 1000)
+        return status, result
+
+
+# Refresh the leaderboards off the event loop now and then every interval
+async def refresh_periodically(service, interval=REFRESH_INTERVAL_S):
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            rows = await loop.run_in_executor(None, service.refresh_leaderboards)
+            if rows:
+                print(f"Merged {rows} crawled tracks into the leaderboards")
+        except Exception as e:
+            print(f"Leaderboard refresh failed ({type(e).__name__}: {e}), retrying in {interval} s")
+        await asyncio.sleep(interval)
+
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+
+
+# Minimal HTTP/1.1 connection loop with keep-alive
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            status, result = await service.handle(method, target, body)
+            payload = json.dumps(result).encode('utf-8')
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            writer.write(
+                f'HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host=HOST, port=PORT, ready=None):
+    """
+    Runs the HTTP server until cancelled.
+
+    Parameters:
+    - service (RecommendationService): Loaded service.
+    - host (str): Interface to listen on (default is 127.0.0.1).
+    - port (int): Port to listen on (default is 8000, 0 picks a free port).
+    - ready (function): Called with the bound port once the server listens (optional).
+    """
+    service.batcher = MicroBatcher(service.score_content_batch)
+    service.hybrid_batcher = MicroBatcher(service.score_hybrid_batch)
+    background_tasks = [asyncio.create_task(service.batcher.run()), asyncio.create_task(service.hybrid_batcher.run()),
+                     asyncio.create_task(refresh_periodically(service))]
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port, backlog=1024)
+    bound_port = server.sockets[0].getsockname()[1]
+    print(f"Recommendation service on http://{host}:{bound_port}")
+    if ready:
+        ready(bound_port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in background_tasks:
+            task.cancel()
+
+
+# Run the script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Headless K-pop recommendation service.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    args = parser.parse_args()
+
+    asyncio.run(serve(RecommendationService(), args.host, args.port))
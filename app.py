@@ -1,32 +1,79 @@
 #Python Script to build a streamlit app 
 
 #Import necessary libraries 
+import os
 import streamlit as st
 import pandas as pd
-from data_processing import load_data, clean_and_prepare_data
-from recommendation_system import popularity_based_recommendation_system, kpop_content_based_recommendation_system, hybrid_recommendation_system
+from catalogue_cache import load_or_build_catalogue
+from recommendation_system import popularity_based_recommendation_system, build_track_index
+from recommender import TrackRecommender
+from popularity_leaderboard import build_leaderboards, CrawlRefresher
+from catalogue import build_catalogue
+from neighbour_table import open_neighbour_tables
+from recommendation_cache import RecommendationCache, make_key
+from thumbnail_cache import ThumbnailCache
+from result_grid import render_grid
 
 # Load Data
 artists_file = 'data/all_artists_data.csv'
 tracks_file = 'data/all_tracks_data.csv'
-artists_df, tracks_df = load_data(artists_file, tracks_file)
 
 # Define genres list
 genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
                'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
                'trot', 'k-pop ballad', 'korean soundtrack']
 
-# Clean and prepare data
-combined_df = clean_and_prepare_data(artists_df, tracks_df, genres_list)
+# Recommendation result cache settings
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 600
 
-# Remove duplicates from the combined DataFrame
-combined_df = combined_df.drop_duplicates()
+# Process-wide resources, built once and shared by every session.
+# The source file modification times are part of the key, so changed CSVs trigger a rebuild.
+@st.cache_resource(show_spinner="Loading catalogue...")
+def load_resources(artists_file, tracks_file, genres, source_mtimes):
+    # Load the cleaned, deduplicated catalogue from the columnar cache (rebuilt only when the CSVs change)
+    combined_df_clean = load_or_build_catalogue(artists_file, tracks_file, list(genres))
+    
+    # Build the integer-ID catalogue model and the genre feature index once for the recommenders
+    catalogue = build_catalogue(combined_df_clean, list(genres))
+    track_index = build_track_index(catalogue)
+    
+    # Precompute the per-genre popularity leaderboards once
+    leaderboards = build_leaderboards(combined_df_clean, list(genres))
+    
+    # Precomputed related-tracks tables (python related_tracks.py), if any match this catalogue
+    related_tables = open_neighbour_tables(track_index)
+    
+    # Read-only recommender shared by every session, queries reuse its pooled score buffers across reruns
+    recommender = TrackRecommender(combined_df_clean, track_index, related_tables)
+    return combined_df_clean, recommender, leaderboards
+
+
+@st.cache_resource
+def get_recommendation_cache(source_mtimes):
+    return RecommendationCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+
+# Merges newly crawled tracks (python data_retrieve.py) into the leaderboards, rebuilt with them
+@st.cache_resource
+def get_crawl_refresher(_leaderboards, artists_file, genres, source_mtimes):
+    return CrawlRefresher(_leaderboards, artists_file, list(genres))
 
-# Optionally, reset index after dropping duplicates
-combined_df = combined_df.reset_index(drop=True)
 
-# Before displaying or recommending tracks, remove duplicates
-combined_df_clean = combined_df.drop_duplicates(subset=['Track Name', 'Track ID', 'URI'], keep='first')
+# Downscaled track and artist images, shared by every session
+@st.cache_resource
+def get_thumbnail_cache():
+    return ThumbnailCache()
+
+
+source_mtimes = (os.path.getmtime(artists_file), os.path.getmtime(tracks_file))
+combined_df_clean, recommender, leaderboards = load_resources(artists_file, tracks_file, tuple(genres_list), source_mtimes)
+recommendation_cache = get_recommendation_cache(source_mtimes)
+
+# Crawl partitions written since the last rerun update the leaderboards, cached popularity results are dropped
+if get_crawl_refresher(leaderboards, artists_file, tuple(genres_list), source_mtimes).refresh():
+    recommendation_cache.clear()
+thumbnail_cache = get_thumbnail_cache()
 
 # Print column names to verify
 #st.write("Columns in DataFrame:", combined_df_clean.columns)
@@ -39,6 +86,12 @@ st.title("K-POP Music Recommendation System")
 # Step 1: Navigation
 st.sidebar.title("Navigation")
 nav_option = st.sidebar.radio("Go to", ["Home", "Get Recommendation"])
+top_n = st.sidebar.slider("Number of results", min_value=10, max_value=100, value=10, step=10)
+
+# Recommendation cache counters
+cache_stats = recommendation_cache.stats()
+st.sidebar.caption(f"Recommendation cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                   f"{cache_stats['size']}/{CACHE_MAX_ENTRIES} entries")
 
 if nav_option == "Home":
     # Step 1: Genre Selection
@@ -47,39 +100,23 @@ if nav_option == "Home":
 
     # Step 2: Display Top Tracks and Artists
     if genre:
-        st.write(f"Top 10 Artists and Tracks in {genre}")
+        st.write(f"Top {top_n} Artists and Tracks in {genre}")
         
-        recommendations = popularity_based_recommendation_system(combined_df_clean, [genre], top_n=10)
-        
-        top_tracks = recommendations[genre]['top_tracks']
-        top_artists = recommendations[genre]['top_artists']
+        recommendations = recommendation_cache.get_or_compute(
+            make_key('popularity', preferred_genres=[genre], top_n=top_n),
+            lambda: popularity_based_recommendation_system(combined_df_clean, [genre], top_n=top_n, leaderboards=leaderboards)
+        )
         
         # Display top tracks with numbering
-        st.write("### Top 10 Tracks")
-        for i in range(0, len(top_tracks), 5):  # 5 items per row
-            cols = st.columns(5)
-            for j, (col, (_, row)) in enumerate(zip(cols, top_tracks.iloc[i:i+5].iterrows())):
-                spotify_url = f"https://open.spotify.com/track/{row['Track ID']}"
-                track_image_url = row.get('Track Image')  # Get track image URL
-                col.image(track_image_url, use_column_width=True)  # Display track image
-                col.write(f"**{i + j + 1}. {row['Track Name']}**")
-                col.write(f"Artist: {row['Artist Name']}")
-                col.write(f"Album: {row['Album Name']}")
-                col.write(f"Popularity: {row['Track Popularity']}")
-                col.write(f"[Listen on Spotify]({spotify_url})")
-                
+        st.write(f"### Top {top_n} Tracks")
+        render_grid(recommendations[genre]['top_tracks'], 'track',
+                    [('Artist', 'Artist Name'), ('Album', 'Album Name'), ('Popularity', 'Track Popularity')],
+                    key=f"home-tracks-{genre}-{top_n}", thumbnails=thumbnail_cache)
         
         # Display top artists with numbering and Spotify profile links
-        st.write("### Top 10 Artists")
-        for i in range(0, len(top_artists), 5):  # 5 items per row
-            cols = st.columns(5)
-            for j, (col, (_, row)) in enumerate(zip(cols, top_artists.iloc[i:i+5].iterrows())):
-                spotify_url = f"https://open.spotify.com/artist/{row['Artist ID']}"
-                artist_image_url = row.get('Artist Image')  # Get artist image URL
-                col.image(artist_image_url, use_column_width=True)  # Display artist image
-                col.write(f"**{i + j + 1}. {row['Artist Name']}**")
-                col.write(f"Followers: {row['Followers']}")
-                col.write(f"[Listen on Spotify]({spotify_url})")
+        st.write(f"### Top {top_n} Artists")
+        render_grid(recommendations[genre]['top_artists'], 'artist', [('Followers', 'Followers')],
+                    key=f"home-artists-{genre}-{top_n}", thumbnails=thumbnail_cache)
     else:
         # Default to K-pop if no genre is selected
         st.write("Top 10 Artists and Tracks in K-pop")
@@ -96,96 +133,61 @@ elif nav_option == "Get Recommendation":
     preferred_genres = st.multiselect("Choose your preferred genres", options=genres_list)
     
     # Step 4: Generate Recommendations
+    # The submitted query is kept in the session so changing the result page does not clear the results
     if st.button("Get Recommendations"):
+        st.session_state['submitted_query'] = (list(selected_tracks), list(preferred_genres), top_n)
+    submitted_query = st.session_state.get('submitted_query')
+    
+    if submitted_query is not None:
+        selected_tracks, preferred_genres, top_n = submitted_query
+        query_key = hash((tuple(selected_tracks), tuple(preferred_genres), top_n))
         if not preferred_genres and not selected_tracks:
             st.write("Please select at least one genre or track to get recommendations.")
         else:
             # Call the hybrid recommendation system with optional user inputs
-            hybrid_recs = hybrid_recommendation_system(
-                combined_df_clean,
-                genres_list,
-                user_interactions=selected_tracks if selected_tracks else None,
-                preferred_genres=preferred_genres if preferred_genres else None,
-                top_n=10
+            hybrid_recs = recommendation_cache.get_or_compute(
+                make_key('hybrid', selected_tracks, preferred_genres, top_n=top_n),
+                lambda: recommender.hybrid_recommendations(
+                    user_interactions=selected_tracks if selected_tracks else None,
+                    preferred_genres=preferred_genres if preferred_genres else None,
+                    top_n=top_n
+                )
             )
             
             if preferred_genres:
-                if len(preferred_genres) == 1:
-                    # Display recommendations only for the single selected genre
-                    genre = preferred_genres[0]
+                # Display recommendations for every selected genre
+                for genre in preferred_genres:
                     if genre in hybrid_recs:
                         tracks_df = hybrid_recs[genre]
                         if isinstance(tracks_df, pd.DataFrame):
                             st.write(f"### Recommended Tracks for Genre: {genre}")
-                            
-                            # Display recommendations in rows of 5
-                            for i in range(0, len(tracks_df), 5):
-                                cols = st.columns(5)
-                                for j, (col, track_row) in enumerate(zip(cols, tracks_df.iloc[i:i+5].iterrows())):
-                                    index, row = track_row
-                                    spotify_url = f"https://open.spotify.com/track/{row['Track ID']}"
-                                    col.write(f"**{i + j + 1}. {row['Track Name']}**")
-                                    col.write(f"Artist: {row['Artist Name']}")
-                                    if 'Track Image' in row and pd.notna(row['Track Image']):
-                                        col.image(row['Track Image'])
-                                    col.write(f"[Listen on Spotify]({spotify_url})")
+                            render_grid(tracks_df, 'track', [('Artist', 'Artist Name')],
+                                        key=f"genre-{genre}-{query_key}", thumbnails=thumbnail_cache)
                         else:
                             st.write(f"Error: Expected DataFrame but got {type(tracks_df)}")
                     else:
                         st.write(f"No recommendations available for genre: {genre}")
-                else:
-                    # Display recommendations for all selected genres
-                    for genre in preferred_genres:
-                        if genre in hybrid_recs:
-                            tracks_df = hybrid_recs[genre]
-                            if isinstance(tracks_df, pd.DataFrame):
-                                st.write(f"### Recommended Tracks for Genre: {genre}")
-                                
-                                # Display recommendations in rows of 5
-                                for i in range(0, len(tracks_df), 5):
-                                    cols = st.columns(5)
-                                    for j, (col, track_row) in enumerate(zip(cols, tracks_df.iloc[i:i+5].iterrows())):
-                                        index, row = track_row
-                                        spotify_url = f"https://open.spotify.com/track/{row['Track ID']}"
-                                        col.write(f"**{i + j + 1}. {row['Track Name']}**")
-                                        col.write(f"Artist: {row['Artist Name']}")
-                                        if 'Track Image' in row and pd.notna(row['Track Image']):
-                                            col.image(row['Track Image'])
-                                        col.write(f"[Listen on Spotify]({spotify_url})")
-                            else:
-                                st.write(f"Error: Expected DataFrame but got {type(tracks_df)}")
-                        else:
-                            st.write(f"No recommendations available for genre: {genre}")
             else:
                 # Handle cases where only track selections are made
                 if selected_tracks:
                     st.write("### Recommended Tracks Based on Your Selected Tracks")
                     
                     # Assuming you have a method to get recommendations based on selected tracks alone
-                    track_based_recs = kpop_content_based_recommendation_system(
-                                    combined_df_clean,
-                                    genres_list,
-                                    user_interactions=selected_tracks if selected_tracks else [],
-                                    preferred_genres=preferred_genres if preferred_genres else None,
-                                     top_n=10
-                     )
+                    track_based_recs = recommendation_cache.get_or_compute(
+                        make_key('content', selected_tracks, preferred_genres, top_n=top_n),
+                        lambda: recommender.content_recommendations(
+                            user_interactions=selected_tracks if selected_tracks else [],
+                            preferred_genres=preferred_genres if preferred_genres else None,
+                            top_n=top_n
+                        )
+                    )
             
                     
                     if isinstance(track_based_recs, pd.DataFrame):
                         if not track_based_recs.empty:
                             st.write("### Recommendations Based on Selected Tracks")
-                            
-                            # Display recommendations in rows of 5
-                            for i in range(0, len(track_based_recs), 5):
-                                cols = st.columns(5)
-                                for j, (col, track_row) in enumerate(zip(cols, track_based_recs.iloc[i:i+5].iterrows())):
-                                    index, row = track_row
-                                    spotify_url = f"https://open.spotify.com/track/{row['Track ID']}"
-                                    col.write(f"**{i + j + 1}. {row['Track Name']}**")
-                                    col.write(f"Artist: {row['Artist Name']}")
-                                    if 'Track Image' in row and pd.notna(row['Track Image']):
-                                        col.image(row['Track Image'])
-                                    col.write(f"[Listen on Spotify]({spotify_url})")
+                            render_grid(track_based_recs, 'track', [('Artist', 'Artist Name')],
+                                        key=f"tracks-{query_key}", thumbnails=thumbnail_cache)
                         else:
                             st.write("No recommendations available based on the selected tracks.")
                     else:
@@ -0,0 +1,123 @@
+#Python Script for batch hybrid recommendations - scores many users at once for offline campaigns
+#Users are scored in chunks, so memory is bounded by chunk size. Scores are the ones of hybrid_scores (and /hybrid):
+#pop_weight * index['popularity'] + content_weight * highest cosine similarity to any of the user's tracks.
+#Unlike hybrid_scores, each user gets one list over all their preferred genres instead of one list per genre.
+
+#Import necessary libraries
+import time
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from recommendation_system import top_k_indices
+from catalogue import tracks_for_names
+
+
+# Cosine similarity between the distinct genre sets of the index, and the genre set of every track.
+# Tracks with the same genre set have the same feature row, so the table holds every track-to-track similarity.
+def genre_set_similarity(index):
+    _, first, codes = np.unique(index['catalogue']['track_genres'], return_index=True, return_inverse=True)
+    features = index['features'][first]
+    return (features @ features.T).toarray(), codes.ravel()
+
+
+# Users x tracks interaction matrix from lists of track names (every version of a name counts)
+def interactions_from_lists(index, user_tracks):
+    rows, cols = [], []
+    for user, tracks in enumerate(user_tracks):
+        positions = tracks_for_names(index['catalogue'], list(tracks))
+        rows.extend([user] * len(positions))
+        cols.extend(positions)
+    data = np.ones(len(rows))
+    return csr_matrix((data, (rows, cols)), shape=(len(user_tracks), len(index['catalogue']['track_ids'])))
+
+
+# Users x genres boolean mask from lists of preferred genres
+def genre_masks_from_lists(index, user_genres):
+    masks = np.zeros((len(user_genres), len(index['genres'])), dtype=bool)
+    genre_positions = {genre: col for col, genre in enumerate(index['genres'])}
+    for user, genres in enumerate(user_genres):
+        for genre in genres:
+            if genre in genre_positions:
+                masks[user, genre_positions[genre]] = True
+    return masks
+
+
+def iter_batch_recommendations(index, interactions, genre_masks, top_n=10, pop_weight=0.5, content_weight=0.5, chunk_size=1000):
+    """
+    Scores users chunk by chunk and yields their top tracks.
+
+    Parameters:
+    - index (dict): Genre index from build_track_index, its 'popularity' scores are used.
+    - interactions (sparse matrix): Users x dense track IDs, non-zero for tracks the user interacted with.
+    - genre_masks (array): Users x genres boolean mask of preferred genres (a row of all False means no preference).
+    - top_n (int): Number of recommendations per user (default is 10).
+    - pop_weight (float): Weight for the popularity score.
+    - content_weight (float): Weight for the content similarity score.
+    - chunk_size (int): Number of users scored at once, memory is about chunk_size x tracks floats.
+
+    Yields:
+    - (start, indices, scores): First user of the chunk, top track positions and their scores.
+    """
+    interactions = csr_matrix(interactions)
+    genre_masks = csr_matrix(np.asarray(genre_masks, dtype=float))
+    similarity, track_codes = genre_set_similarity(index)
+    track_genres = (index['counts'] > 0).astype(float).T.tocsr()
+    popularity = pop_weight * index['popularity']
+    
+    for start in range(0, interactions.shape[0], chunk_size):
+        stop = min(start + chunk_size, interactions.shape[0])
+        seen = interactions[start:stop]
+        masks = genre_masks[start:stop]
+        
+        # Highest cosine similarity to any seed track, per genre set then spread over the tracks (0 without seeds)
+        content = np.zeros((stop - start, len(similarity)))
+        has_seeds = np.diff(seen.indptr) > 0
+        if has_seeds.any():
+            seed_rows = similarity[track_codes[seen.indices]]
+            content[has_seeds] = np.maximum.reduceat(seed_rows, seen.indptr[:-1][has_seeds], axis=0)
+        content = content[:, track_codes]
+        
+        # Tracks in any preferred genre, users without preferences keep the whole catalogue
+        in_genres = np.asarray((masks @ track_genres).todense()) > 0
+        in_genres[np.asarray(masks.sum(axis=1)).ravel() == 0] = True
+        
+        scores = popularity + content_weight * content
+        scores[~in_genres] = -np.inf
+        scores[seen.nonzero()] = -np.inf
+        
+        indices = top_k_indices(scores, top_n)
+        yield start, indices, np.take_along_axis(scores, indices, axis=1)
+
+
+def batch_hybrid_recommendation_system(index, interactions, genre_masks, output_file, top_n=10, pop_weight=0.5, content_weight=0.5, chunk_size=1000):
+    """
+    Batch version of hybrid_recommendation_system for many users, written to a CSV file chunk by chunk.
+
+    Parameters:
+    - output_file (str): CSV file with one row per (User, Rank, Track ID, Track Name, Score).
+    - Other parameters are the same as iter_batch_recommendations.
+
+    Returns:
+    - stats (dict): Number of users, elapsed seconds and throughput in users/sec.
+    """
+    start_time = time.perf_counter()
+    n_users = 0
+    catalogue = index['catalogue']
+    
+    for start, indices, scores in iter_batch_recommendations(index, interactions, genre_masks, top_n, pop_weight, content_weight, chunk_size):
+        users, ranks = np.nonzero(np.isfinite(scores))
+        tracks = indices[users, ranks]
+        chunk_df = pd.DataFrame({
+            'User': start + users,
+            'Rank': ranks + 1,
+            'Track ID': catalogue['track_ids'][tracks],
+            'Track Name': catalogue['track_names'][tracks],
+            'Score': scores[users, ranks],
+        })
+        chunk_df.to_csv(output_file, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+        n_users += len(indices)
+    
+    elapsed = time.perf_counter() - start_time
+    stats = {'users': n_users, 'seconds': elapsed, 'users_per_sec': n_users / elapsed if elapsed else float('inf')}
+    print(f"Scored {n_users} users in {elapsed:.2f}s ({stats['users_per_sec']:.0f} users/sec)")
+    return stats
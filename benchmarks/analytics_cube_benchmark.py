@@ -0,0 +1,75 @@
+#Python Script to benchmark the data behind the analysis dashboard: per-chart scans vs the analytics cube
+#"per-chart" repeats what the charts did before the cube: one genre filter and two nlargest over the full prepared
+#frame per genre, plus a groupby over it per summary chart. "cube" builds analytics_cube once and reads every chart
+#from its small tables; "cached" is the same after loading the persisted cube. Plotly rendering is not timed.
+#Run from the repository root: python -m benchmarks.analytics_cube_benchmark
+
+#Import necessary libraries
+import time
+import shutil
+import tempfile
+from data_processing import load_data, clean_and_prepare_data
+from analytics_cube import build_analytics_cube, save_analytics_cube, load_analytics_cube
+from benchmarks.recommendation_benchmark import synthetic_catalogue
+
+ROW_COUNTS = [100_000, 1_000_000]
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# Chart data as computed before, straight from the prepared frame
+def per_chart(df):
+    for genre in genres_list:
+        genre_df = df[df['Genres'] == genre]
+        genre_df.nlargest(10, 'Followers')
+        genre_df.nlargest(10, 'Artist Popularity')
+    df.groupby('Artist Name')['Track Popularity'].mean()
+    df.loc[df.groupby('Artist Name')['Track Popularity'].idxmax()]
+    df.groupby('Album Name')['Track Name'].count()
+    df.groupby('Album Name')['Track Popularity'].mean().nlargest(10)
+    df.groupby('Artist Name')['Followers'].mean().nlargest(10)
+
+
+# Chart data read from the cube tables
+def from_cube(cube):
+    artist_genres = cube['artist_genres']
+    for genre in genres_list:
+        genre_df = artist_genres[artist_genres['Genre'] == genre]
+        genre_df.nlargest(10, 'Followers')
+        genre_df.nlargest(10, 'Artist Popularity')
+    cube['artists'].nlargest(10, 'Average Track Popularity')
+    cube['albums'].nlargest(10, 'Average Track Popularity')
+    cube['artists'].nlargest(10, 'Followers')
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    artists_df, tracks_df = load_data('data/all_artists_data.csv', 'data/all_tracks_data.csv')
+    prepared = clean_and_prepare_data(artists_df, tracks_df, genres_list)
+    cube_dir = tempfile.mkdtemp(prefix='analytics-')
+
+    print(f"{'rows':>10} {'per-chart (ms)':>15} {'cube build (ms)':>16} {'cube charts (ms)':>17} {'cached load (ms)':>17} {'cube rows':>10}")
+    try:
+        for n_rows in [len(prepared)] + ROW_COUNTS:
+            df = prepared if n_rows == len(prepared) else synthetic_catalogue(prepared, n_rows)
+            scans, _ = timed(per_chart, df)
+            build, cube = timed(build_analytics_cube, df)
+            charts, _ = timed(from_cube, cube)
+            save_analytics_cube(cube, cube_dir)
+            load, cube = timed(load_analytics_cube, cube_dir)
+            load += timed(from_cube, cube)[0]
+            print(f"{n_rows:>10} {scans:>15.1f} {build:>16.1f} {charts:>17.1f} {load:>17.1f} {sum(len(table) for table in cube.values()):>10}")
+    finally:
+        shutil.rmtree(cube_dir, ignore_errors=True)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
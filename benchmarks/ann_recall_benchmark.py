@@ -0,0 +1,84 @@
+#Python Script to benchmark the LSH index against exact content similarity - recall@k and latency per query
+#Run from the repository root: python -m benchmarks.ann_recall_benchmark
+
+#Import necessary libraries
+import time
+import numpy as np
+from catalogue_cache import prepare_catalogue
+from catalogue import build_catalogue
+from recommendation_system import build_track_index
+from ann_index import build_ann_index, ann_search
+
+TOP_K = 10
+N_QUERIES = 500
+
+# (tables, bits, probes) from fast/low recall to slow/high recall
+SETTINGS = [(2, 12, 0), (4, 10, 0), (8, 10, 2), (16, 8, 4)]
+
+# Synthetic catalogue: tracks scattered around genre-like cluster centres, big enough for buckets to matter
+SYNTHETIC_TRACKS = 200_000
+SYNTHETIC_DIM = 32
+SYNTHETIC_CLUSTERS = 200
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# Exact top-k with the query itself excluded, plus the k-th best score for tie-aware recall
+def exact_search(vectors, queries, top_k):
+    scores = vectors[queries] @ vectors.T
+    scores[np.arange(len(queries)), queries] = -np.inf
+    top = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+    return top, np.take_along_axis(scores, top[:, -1:], axis=1)
+
+
+# A returned track counts as a hit when it scores at least the exact k-th score (equal-score tracks are interchangeable)
+def recall_at_k(vectors, queries, approximate, kth_scores):
+    valid = approximate >= 0
+    scores = np.einsum('qd,qkd->qk', vectors[queries], vectors[np.where(valid, approximate, 0)])
+    hits = valid & (scores >= kth_scores - 1e-6)
+    return hits.sum() / approximate.size
+
+
+def run(name, vectors, rng):
+    vectors = vectors.astype(np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    queries = rng.choice(len(vectors), size=min(N_QUERIES, len(vectors)), replace=False)
+    
+    start = time.perf_counter()
+    _, kth_scores = exact_search(vectors, queries, TOP_K)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"\n{name}: {len(vectors)} tracks x {vectors.shape[1]} features, exact {exact_ms:.3f} ms/query")
+    print(f"{'tables':>7} {'bits':>5} {'probes':>7} {'build (s)':>10} {'recall@' + str(TOP_K):>10} {'ms/query':>9} {'speedup':>8}")
+    
+    for n_tables, n_bits, n_probes in SETTINGS:
+        start = time.perf_counter()
+        ann = build_ann_index(vectors, n_tables, n_bits)
+        build_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        approximate = ann_search(ann, queries, TOP_K, n_probes, exclude=queries[:, None])
+        ann_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        
+        recall = recall_at_k(vectors, queries, approximate, kth_scores)
+        print(f"{n_tables:>7} {n_bits:>5} {n_probes:>7} {build_time:>10.2f} {recall:>10.3f} {ann_ms:>9.3f} {exact_ms / ann_ms:>7.1f}x")
+
+
+def main():
+    rng = np.random.default_rng(42)
+    
+    # Bundled data/ catalogue, the genre features the content recommender uses
+    df = prepare_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    index = build_track_index(build_catalogue(df, genres_list))
+    run('data/ catalogue', index['features'].toarray(), rng)
+    
+    centres = rng.standard_normal((SYNTHETIC_CLUSTERS, SYNTHETIC_DIM))
+    synthetic = centres[rng.integers(SYNTHETIC_CLUSTERS, size=SYNTHETIC_TRACKS)]
+    synthetic += 0.5 * rng.standard_normal(synthetic.shape)
+    run('synthetic catalogue', synthetic, rng)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
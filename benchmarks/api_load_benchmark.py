@@ -0,0 +1,84 @@
+#Python Script to load test the headless recommendation service (api_server.py)
+#Starts the service in-process on a free port and drives it with keep-alive client connections.
+#Run from the repository root: python -m benchmarks.api_load_benchmark
+
+#Import necessary libraries
+import json
+import time
+import asyncio
+import threading
+import numpy as np
+from api_server import RecommendationService, serve
+
+# Load settings
+CONNECTIONS = 64
+REQUESTS_PER_CONNECTION = 200
+ENDPOINT_MIX = {'popularity': 0.4, 'content': 0.4, 'hybrid': 0.2}
+
+
+def build_requests(service, rng, count):
+    names = service.catalogue['track_names']
+    requests = []
+    for endpoint in rng.choice(list(ENDPOINT_MIX), size=count, p=list(ENDPOINT_MIX.values())):
+        if endpoint == 'popularity':
+            genre = rng.choice(list(service.popular_records))
+            requests.append(f'GET /popularity?genre={genre.replace(" ", "%20").replace("&", "%26")}&top_n=10 HTTP/1.1\r\nHost: bench\r\n\r\n'.encode())
+        else:
+            body = json.dumps({'tracks': list(rng.choice(names, rng.integers(1, 4))),
+                               'preferred_genres': list(rng.choice(service.genres, rng.integers(0, 3))), 'top_n': 10}).encode()
+            requests.append(f'POST /{endpoint} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n'.encode() + body)
+    return requests
+
+
+async def client(port, requests, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for request in requests:
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            if line.lower().startswith(b'content-length'):
+                length = int(line.split(b':')[1])
+        await reader.readexactly(length)
+        statuses[int(status_line.split()[1])] = statuses.get(int(status_line.split()[1]), 0) + 1
+    writer.close()
+
+
+async def run_load(port, service):
+    rng = np.random.default_rng(42)
+    statuses = {}
+    clients = [client(port, build_requests(service, rng, REQUESTS_PER_CONNECTION), statuses) for _ in range(CONNECTIONS)]
+    start = time.perf_counter()
+    await asyncio.gather(*clients)
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    service = RecommendationService()
+    ready = threading.Event()
+    ports = []
+    
+    def run_server():
+        asyncio.run(serve(service, port=0, ready=lambda port: (ports.append(port), ready.set())))
+    threading.Thread(target=run_server, daemon=True).start()
+    ready.wait()
+    
+    elapsed, statuses = asyncio.run(run_load(ports[0], service))
+    total = CONNECTIONS * REQUESTS_PER_CONNECTION
+    print(f"{total} requests over {CONNECTIONS} connections in {elapsed:.2f}s: {total / elapsed:.0f} requests/sec, statuses {statuses}")
+    
+    metrics = service.metrics()
+    for endpoint, histogram in metrics['latency'].items():
+        print(f"{endpoint:>12}: {histogram['count']} requests, p50 <= {histogram['p50_ms']} ms, p95 <= {histogram['p95_ms']} ms, p99 <= {histogram['p99_ms']} ms")
+    for endpoint in ('content', 'hybrid'):
+        batch = metrics[f'{endpoint}_batch_size']
+        print(f"{endpoint} batches: {batch['count']}, mean size {batch['sum_ms'] / max(batch['count'], 1):.1f}")
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#Python Script to benchmark batch hybrid recommendations on the bundled catalogue
+#Run from the repository root: python -m benchmarks.batch_hybrid_benchmark
+
+#Import necessary libraries
+import os
+import tempfile
+import numpy as np
+from catalogue_cache import prepare_catalogue
+from recommendation_system import build_track_index
+from catalogue import build_catalogue
+from batch_recommendation import interactions_from_lists, genre_masks_from_lists, batch_hybrid_recommendation_system
+
+# Simulated campaign sizes
+USER_COUNTS = [10_000, 100_000]
+MAX_SEEDS = 5
+MAX_GENRES = 3
+CHUNK_SIZE = 2000
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+def main():
+    combined_df_clean = prepare_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    
+    index = build_track_index(build_catalogue(combined_df_clean, genres_list))
+    rng = np.random.default_rng(42)
+    
+    for n_users in USER_COUNTS:
+        # Random listening histories and genre preferences
+        user_tracks = [rng.choice(index['catalogue']['track_names'], rng.integers(0, MAX_SEEDS + 1)) for _ in range(n_users)]
+        user_genres = [rng.choice(genres_list, rng.integers(0, MAX_GENRES + 1)) for _ in range(n_users)]
+        interactions = interactions_from_lists(index, user_tracks)
+        genre_masks = genre_masks_from_lists(index, user_genres)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'recommendations.csv')
+            batch_hybrid_recommendation_system(index, interactions, genre_masks, output_file, chunk_size=CHUNK_SIZE)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#Python Script to benchmark cold start - process start to first recommendation served
+#Each run is a fresh `python -X importtime` process that imports the recommender core, loads the catalogue from
+#the cache and serves one content recommendation. The "eager" runs first import the modules the core used to load
+#at import time (scikit-learn, IPython, plotly, matplotlib, seaborn) to show the saving of the lazy imports.
+#Run from the repository root: python -m benchmarks.cold_start_benchmark
+
+#Import necessary libraries
+import sys
+import json
+import subprocess
+import numpy as np
+
+RUNS = 5
+TARGET_REDUCTION = 0.5  # Import time must at least halve compared with the eager imports
+
+# Modules recommendation_system / data_processing imported at module level before the split
+EAGER_MODULES = ['IPython.display', 'sklearn.metrics.pairwise', 'sklearn.preprocessing', 'sklearn.feature_extraction.text',
+                 'sklearn.model_selection', 'sklearn.linear_model', 'sklearn.metrics', 'matplotlib.pyplot', 'seaborn',
+                 'plotly.graph_objects', 'plotly.subplots', 'plotly.express']
+HEAVY_PREFIXES = ('sklearn', 'IPython', 'matplotlib', 'seaborn', 'plotly')
+
+CHILD = '''
+import sys, time, json
+start = time.perf_counter()
+for module in {preload!r}:
+    __import__(module)
+from catalogue_cache import load_or_build_catalogue
+from catalogue import build_catalogue
+from recommendation_system import build_track_index, kpop_content_based_recommendation_system
+imported = time.perf_counter()
+genres_list = {genres!r}
+df = load_or_build_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+index = build_track_index(build_catalogue(df, genres_list))
+loaded = time.perf_counter()
+kpop_content_based_recommendation_system(df, genres_list, [df['Track Name'].iloc[0]], top_n=10, index=index)
+served = time.perf_counter()
+heavy = sorted(m for m in sys.modules if m.split('.')[0] in {heavy!r})
+print(json.dumps({{'import_ms': (imported - start) * 1000, 'load_ms': (loaded - imported) * 1000,
+                  'first_ms': (served - loaded) * 1000, 'total_ms': (served - start) * 1000, 'heavy': heavy[:5]}}))
+'''
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# One fresh interpreter: timings from the child plus the slowest top-level imports reported by -X importtime
+def run_once(preload):
+    code = CHILD.format(preload=preload, genres=genres_list, heavy=HEAVY_PREFIXES)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name.startswith('  '):
+            top_level.append((int(cumulative) / 1000, name.strip()))
+    timings['slowest_imports'] = sorted(top_level, reverse=True)[:5]
+    return timings
+
+
+def main():
+    # Warm the catalogue cache so both variants only read it
+    run_once([])
+
+    results = {}
+    for variant, preload in (('eager', EAGER_MODULES), ('lazy', [])):
+        runs = [run_once(preload) for _ in range(RUNS)]
+        results[variant] = {key: np.median([run[key] for run in runs]) for key in ('import_ms', 'load_ms', 'first_ms', 'total_ms')}
+        results[variant]['runs'] = runs
+
+    print(f"Median of {RUNS} fresh processes: import core -> load cached catalogue -> first content recommendation")
+    print(f"{'variant':>8} {'import (ms)':>12} {'load (ms)':>10} {'first rec (ms)':>15} {'total (ms)':>11}")
+    for variant, result in results.items():
+        print(f"{variant:>8} {result['import_ms']:>12.0f} {result['load_ms']:>10.0f} {result['first_ms']:>15.1f} {result['total_ms']:>11.0f}")
+
+    lazy = results['lazy']['runs'][-1]
+    print(f"\nHeavy modules imported by the core: {lazy['heavy'] or 'none'}")
+    print("Slowest top-level imports (lazy, ms): " + ', '.join(f'{name} {ms:.0f}' for ms, name in lazy['slowest_imports']))
+
+    reduction = 1 - results['lazy']['import_ms'] / results['eager']['import_ms']
+    status = 'PASS' if reduction >= TARGET_REDUCTION and not lazy['heavy'] else 'FAIL'
+    print(f"Import time reduction: {reduction:.0%} (target {TARGET_REDUCTION:.0%}) - {status}")
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#Python Script to benchmark genre filtering - per-row `genre in x` lambdas vs uint64 bitmasks
+#Run from the repository root: python -m benchmarks.genre_filter_benchmark
+
+#Import necessary libraries
+import time
+import numpy as np
+import pandas as pd
+from genre_filter import encode_genres, compile_genre_query, match_genres
+
+# Catalogue sizes, the bundled artists' Genres column is tiled to reach them
+CATALOGUE_SIZES = [10_000, 100_000, 1_000_000]
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    genres = pd.read_csv('data/all_artists_data.csv')['Genres'].fillna('')
+    print(f"{'rows':>10} {'lambda (ms)':>12} {'encode (ms)':>12} {'bitmask queries (ms)':>21} {'substring-only matches':>23}")
+    
+    for n_rows in CATALOGUE_SIZES:
+        column = pd.Series(np.resize(genres.to_numpy(), n_rows))
+        
+        # Old path: one Python lambda per row per genre, substring semantics
+        lambda_matches, lambda_time = timed(lambda: [column.apply(lambda x: genre in x).to_numpy() for genre in genres_list])
+        
+        # New path: encode once, then every genre query is a vectorized bitwise operation
+        masks, encode_time = timed(lambda: encode_genres(column, genres_list))
+        positions = {genre: bit for bit, genre in enumerate(genres_list)}
+        bitmask_matches, query_time = timed(lambda: [match_genres(masks, compile_genre_query(positions, any_of=[genre])) for genre in genres_list])
+        
+        # Rows the old substring check matched but exact matching does not, e.g. 'k-pop' in 'k-pop ballad'
+        false_positives = sum(int((old & ~new).sum()) for old, new in zip(lambda_matches, bitmask_matches))
+        print(f"{n_rows:>10} {lambda_time * 1000:>12.1f} {encode_time * 1000:>12.1f} {query_time * 1000:>21.1f} {false_positives:>23}")
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#Python Script to benchmark recommendation quality and latency of the popularity, content and hybrid modes
+#Quality: every artist with enough tracks in the bundled data/ catalogue acts as a user. Part of their tracks are
+#held out with train_test_split, the rest (plus the artist's genres) are the user's input, and the held-out tracks
+#are the relevant items for precision@k / recall@k. Catalogue coverage and artist diversity describe the recommendation lists.
+#Latency: the bundled catalogue is tiled to synthetic sizes and each mode reports wall time, peak memory and throughput.
+#Run from the repository root: python -m benchmarks.recommendation_benchmark [--sizes 10000 100000 1000000]
+
+#Import necessary libraries
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from catalogue_cache import prepare_catalogue
+from catalogue import build_catalogue
+from genre_filter import split_genres
+from recommendation_system import (build_track_index, popularity_based_recommendation_system,
+                                   kpop_content_based_recommendation_system, hybrid_recommendation_system)
+
+TOP_K = 10
+MIN_USER_TRACKS = 4
+TEST_SIZE = 0.3
+CATALOGUE_SIZES = [10_000, 100_000, 1_000_000]
+N_QUERIES = 20
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# Per-genre result frames -> one ranked list of Track IDs (best score first, first occurrence wins)
+def _merge_ranked(frames, score_column, top_k):
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return []
+    merged = pd.concat(frames).sort_values(score_column, ascending=False, kind='stable')
+    return merged['Track ID'].drop_duplicates().head(top_k).tolist()
+
+
+def recommend(mode, df, index, user_tracks, user_genres, top_k=TOP_K):
+    if mode == 'popularity':
+        recs = popularity_based_recommendation_system(df, user_genres, top_k, catalogue=index['catalogue'])
+        return _merge_ranked([recs[genre]['top_tracks'] for genre in recs], 'Track Popularity', top_k)
+    if mode == 'content':
+        return kpop_content_based_recommendation_system(df, genres_list, user_tracks, user_genres, top_k, index=index)['Track ID'].tolist()
+    recs = hybrid_recommendation_system(df, genres_list, user_tracks, user_genres, top_k, index=index)
+    return _merge_ranked(recs.values(), 'Hybrid Score', top_k)
+
+
+# Held-out split per user: (input track names, input genres, held-out Track IDs)
+def build_users(df, seed=42):
+    users = []
+    for _, rows in df.groupby('Artist ID', sort=True):
+        tracks = rows.drop_duplicates('Track ID')
+        if len(tracks) < MIN_USER_TRACKS:
+            continue
+        train, test = train_test_split(tracks, test_size=TEST_SIZE, random_state=seed)
+        genres = [genre for genre in split_genres(rows['Genres'].iloc[0]) if genre in genres_list]
+        users.append((train['Track Name'].tolist(), genres, set(test['Track ID'])))
+    return users
+
+
+# Share of distinct artists in a list (genre vectors barely differ within a preferred genre, artists do)
+def _diversity(index, track_positions):
+    if len(track_positions) == 0:
+        return np.nan
+    return len(np.unique(index['catalogue']['track_artist'][track_positions])) / len(track_positions)
+
+
+def evaluate_quality(df, index):
+    users = build_users(df)
+    track_ids = index['catalogue']['track_ids']
+    print(f"Quality on data/: {len(users)} users (artists with >= {MIN_USER_TRACKS} tracks), {TEST_SIZE:.0%} of their tracks held out, k = {TOP_K}")
+    print(f"{'mode':>11} {'precision@k':>12} {'recall@k':>9} {'coverage':>9} {'diversity':>10}")
+
+    for mode in ('popularity', 'content', 'hybrid'):
+        precision, recall, diversity, recommended = [], [], [], set()
+        for user_tracks, user_genres, held_out in users:
+            recs = recommend(mode, df, index, user_tracks, user_genres)
+            hits = len(held_out.intersection(recs))
+            precision.append(hits / TOP_K)
+            recall.append(hits / len(held_out))
+            diversity.append(_diversity(index, track_ids.get_indexer(recs)))
+            recommended.update(recs)
+        coverage = len(recommended) / len(track_ids)
+        print(f"{mode:>11} {np.mean(precision):>12.3f} {np.mean(recall):>9.3f} {coverage:>9.3f} {np.nanmean(diversity):>10.3f}")
+
+
+# Bundled catalogue repeated to n_rows with fresh track names and track/album/artist IDs per copy
+def synthetic_catalogue(df, n_rows):
+    rows = np.resize(np.arange(len(df)), n_rows)
+    copy = pd.Series(np.arange(n_rows) // len(df)).astype(str).to_numpy()
+    synthetic = df.iloc[rows].reset_index(drop=True)
+    for column in ('Track ID', 'Track Name', 'Album ID', 'Artist ID'):
+        synthetic[column] = synthetic[column].to_numpy(dtype=object) + '-' + copy
+    return synthetic
+
+
+def measure(func, queries):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for query in queries:
+        func(*query)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def evaluate_scaling(df, sizes, n_queries):
+    rng = np.random.default_rng(42)
+    print(f"\nLatency on the tiled catalogue, {n_queries} queries per mode")
+    print(f"{'tracks':>10} {'mode':>11} {'setup (s)':>10} {'ms/query':>9} {'queries/s':>10} {'peak MB':>8}")
+
+    for n_rows in sizes:
+        synthetic = synthetic_catalogue(df, n_rows)
+        start = time.perf_counter()
+        index = build_track_index(build_catalogue(synthetic, genres_list))
+        setup = time.perf_counter() - start
+
+        names = index['catalogue']['track_names']
+        queries = [(list(rng.choice(names, rng.integers(1, 4))), list(rng.choice(genres_list, rng.integers(1, 3), replace=False)))
+                   for _ in range(n_queries)]
+        for mode in ('popularity', 'content', 'hybrid'):
+            elapsed, peak = measure(lambda tracks, genres: recommend(mode, synthetic, index, tracks, genres), queries)
+            print(f"{len(index['catalogue']['track_ids']):>10} {mode:>11} {setup:>10.2f} {elapsed / n_queries * 1000:>9.2f} "
+                  f"{n_queries / elapsed:>10.1f} {peak / 2**20:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recommendation quality and latency benchmark.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=CATALOGUE_SIZES)
+    parser.add_argument('--queries', type=int, default=N_QUERIES)
+    args = parser.parse_args()
+
+    df = prepare_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    index = build_track_index(build_catalogue(df, genres_list))
+    evaluate_quality(df, index)
+    evaluate_scaling(df, args.sizes, args.queries)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#Python Script to benchmark per-query memory of the recommenders: module functions vs the TrackRecommender object
+#For growing tiled catalogues, tracemalloc records the peak memory allocated while one content or hybrid query runs
+#(after a warm-up query, so the object's pooled buffers already exist), for the functions of
+#recommendation_system.py and for TrackRecommender. The object should stay flat as the catalogue grows and only
+#grow with top_n and the number of seed tracks. Results are checked to be identical, and a thread pool runs the
+#same queries concurrently against one shared object.
+#Run from the repository root: python -m benchmarks.recommender_allocation_benchmark
+
+#Import necessary libraries
+import time
+import tracemalloc
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from data_processing import load_data, clean_and_prepare_data
+from catalogue import build_catalogue, tracks_for_names
+from recommendation_system import build_track_index, kpop_content_based_recommendation_system, hybrid_recommendation_system
+from recommender import TrackRecommender
+from benchmarks.recommendation_benchmark import synthetic_catalogue
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+N_QUERIES = 20
+N_THREADS = 8
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+# Random queries: (selected track names, preferred genres)
+def make_queries(catalogue, n_queries, n_seeds, seed=42):
+    rng = np.random.default_rng(seed)
+    names = catalogue['track_names']
+    return [(list(rng.choice(names, n_seeds)), list(rng.choice(genres_list, 2))) for _ in range(n_queries)]
+
+
+# Highest memory allocated by a single query (KB), above what was allocated before it
+def peak_per_query(func, queries):
+    func(*queries[0])
+    tracemalloc.start()
+    peaks = []
+    for query in queries:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(*query)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return max(peaks) / 1024
+
+
+def same_results(df, index, recommender, queries, top_n):
+    for tracks, genres in queries:
+        content = kpop_content_based_recommendation_system(df, genres_list, tracks, top_n=top_n, index=index)
+        if not content.equals(recommender.content_recommendations(tracks, top_n=top_n)):
+            return False
+        hybrid = hybrid_recommendation_system(df, genres_list, tracks, genres, top_n, index=index)
+        ours = recommender.hybrid_recommendations(tracks, genres, top_n)
+        if not all(hybrid[genre].equals(ours[genre]) for genre in genres):
+            return False
+    return True
+
+
+def main():
+    artists_df, tracks_df = load_data('data/all_artists_data.csv', 'data/all_tracks_data.csv')
+    prepared = clean_and_prepare_data(artists_df, tracks_df, genres_list).drop_duplicates(subset=['Track ID'])
+
+    print(f"Peak KB allocated per query, max over {N_QUERIES} queries (top_n 10, 3 seed tracks)")
+    print(f"{'tracks':>10} {'content fn':>11} {'content obj':>12} {'hybrid fn':>10} {'hybrid obj':>11} {'identical':>10}")
+    for n_rows in ROW_COUNTS:
+        df = synthetic_catalogue(prepared, n_rows)
+        index = build_track_index(build_catalogue(df, genres_list))
+        recommender = TrackRecommender(df, index)
+        queries = make_queries(index['catalogue'], N_QUERIES, 3)
+
+        content_fn = peak_per_query(lambda tracks, genres: kpop_content_based_recommendation_system(df, genres_list, tracks, index=index), queries)
+        content_obj = peak_per_query(lambda tracks, genres: recommender.content_recommendations(tracks), queries)
+        hybrid_fn = peak_per_query(lambda tracks, genres: hybrid_recommendation_system(df, genres_list, tracks, genres, index=index), queries)
+        hybrid_obj = peak_per_query(lambda tracks, genres: recommender.hybrid_recommendations(tracks, genres), queries)
+        identical = same_results(df, index, recommender, queries[:5], 10)
+        print(f"{len(recommender.track_rows):>10} {content_fn:>11.0f} {content_obj:>12.0f} {hybrid_fn:>10.0f} {hybrid_obj:>11.0f} {str(identical):>10}")
+
+    # Largest catalogue: the object's per-query memory follows top_n and the seed count
+    print(f"\nTrackRecommender peak KB per query on {len(recommender.track_rows)} tracks")
+    print(f"{'top_n':>6} {'seeds':>6} {'content':>8} {'hybrid':>7}")
+    for top_n, n_seeds in [(10, 1), (10, 10), (100, 1), (100, 10), (1000, 10)]:
+        queries = make_queries(index['catalogue'], N_QUERIES, n_seeds)
+        content = peak_per_query(lambda tracks, genres: recommender.content_recommendations(tracks, top_n=top_n), queries)
+        hybrid = peak_per_query(lambda tracks, genres: recommender.hybrid_recommendations(tracks, genres, top_n), queries)
+        print(f"{top_n:>6} {n_seeds:>6} {content:>8.0f} {hybrid:>7.0f}")
+
+    # One shared object queried from a thread pool, results equal to the sequential ones
+    seed_lists = [(tracks_for_names(index['catalogue'], tracks), genres) for tracks, genres in make_queries(index['catalogue'], 200, 3, seed=7)]
+    start = time.perf_counter()
+    sequential = [recommender.hybrid_scores(seeds, genres)[0] for seeds, genres in seed_lists]
+    elapsed = time.perf_counter() - start
+    with ThreadPoolExecutor(N_THREADS) as pool:
+        start = time.perf_counter()
+        threaded = list(pool.map(lambda query: recommender.hybrid_scores(*query)[0], seed_lists))
+        threaded_elapsed = time.perf_counter() - start
+    agree = all(np.array_equal(a, b) for a, b in zip(sequential, threaded))
+    print(f"\n{len(seed_lists)} hybrid queries: sequential {elapsed * 1000:.0f} ms, {N_THREADS} threads {threaded_elapsed * 1000:.0f} ms, identical {agree}")
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#Python Script to benchmark result rendering and the thumbnail cache offline
+#A local HTTP server stands in for the Spotify image CDN: it serves generated 640x640 JPEGs with a fixed delay.
+#For growing top_n, the shared result grid (result_grid.render_grid, run in streamlit bare mode) is timed with a
+#cold cache, a warm memory cache and a warm disk cache (new process-level cache), against fetching every image of
+#the result list one by one as the old grids did on each rerun.
+#Run from the repository root: python -m benchmarks.thumbnail_benchmark
+
+#Import necessary libraries
+import io
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import requests
+import pandas as pd
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from PIL import Image
+from thumbnail_cache import ThumbnailCache
+from result_grid import render_grid, PAGE_SIZE
+
+TOP_NS = [10, 50, 100, 500]
+IMAGE_DELAY = 0.02  # Seconds per image request, like a remote CDN
+
+
+def _jpeg(size=640):
+    output = io.BytesIO()
+    Image.effect_noise((size, size), 64).convert('RGB').save(output, format='JPEG', quality=90)
+    return output.getvalue()
+
+
+IMAGE = _jpeg()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(IMAGE_DELAY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Ranked tracks whose images live on the stand-in server (one distinct image per track and run)
+def results(base_url, top_n, run):
+    return pd.DataFrame({
+        'Track ID': [f'track{run}-{i}' for i in range(top_n)],
+        'Track Name': [f'Track {i}' for i in range(top_n)],
+        'Artist Name': [f'Artist {i % 7}' for i in range(top_n)],
+        'Track Image': [f'{base_url}/image/{run}-{i}.jpg' for i in range(top_n)],
+    })
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+# Every image of the list fetched one after another, nothing cached
+def fetch_all(df):
+    with requests.Session() as session:
+        for url in df['Track Image']:
+            session.get(url).content
+
+
+def main():
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    server = start_server()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    cache_dir = tempfile.mkdtemp(prefix='thumbnails-')
+    fields = [('Artist', 'Artist Name')]
+
+    print(f"Stand-in image server at {base_url}, {IMAGE_DELAY * 1000:.0f} ms per image, {len(IMAGE) // 1024} KB JPEGs, page size {PAGE_SIZE}")
+    print(f"{'top_n':>6} {'fetch all (ms)':>15} {'grid cold (ms)':>15} {'grid memory (ms)':>17} {'grid disk (ms)':>15}")
+    try:
+        # Warm-up render (streamlit and Pillow initialisation)
+        warmup = ThumbnailCache(cache_dir=cache_dir)
+        render_grid(results(base_url, PAGE_SIZE, 'warmup'), 'track', fields, key='warmup', thumbnails=warmup)
+        warmup.close()
+
+        for run, top_n in enumerate(TOP_NS):
+            df = results(base_url, top_n, run)
+            naive = timed(lambda: fetch_all(df))
+
+            cache = ThumbnailCache(cache_dir=cache_dir)
+            cold = timed(lambda: render_grid(df, 'track', fields, key=f'bench-{run}', thumbnails=cache))
+            cache.get_many(df['Track Image'].iloc[PAGE_SIZE:2 * PAGE_SIZE])  # Wait for the prefetched next page
+            memory = timed(lambda: render_grid(df, 'track', fields, key=f'bench-{run}', thumbnails=cache))
+            cache.close()
+
+            # A fresh cache (e.g. after a restart) reads the thumbnails back from disk
+            restarted = ThumbnailCache(cache_dir=cache_dir)
+            disk = timed(lambda: render_grid(df, 'track', fields, key=f'bench-{run}', thumbnails=restarted))
+            restarted.get_many(df['Track Image'].iloc[PAGE_SIZE:2 * PAGE_SIZE])
+            stats = restarted.stats()
+            sample = restarted.get(df['Track Image'].iloc[0])
+            restarted.close()
+            print(f"{top_n:>6} {naive:>15.1f} {cold:>15.1f} {memory:>17.1f} {disk:>15.1f}")
+
+        with Image.open(io.BytesIO(sample)) as thumbnail:
+            print(f"\nThumbnail {thumbnail.size[0]}x{thumbnail.size[1]}, {len(sample) // 1024} KB (source {len(IMAGE) // 1024} KB); "
+                  f"disk cache {stats['disk_bytes'] // 1024} KB")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
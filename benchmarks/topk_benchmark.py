@@ -0,0 +1,48 @@
+#Python Script to benchmark top-k selection - full sort vs np.argpartition
+#Run from the repository root: python -m benchmarks.topk_benchmark
+
+#Import necessary libraries
+import time
+import numpy as np
+from recommendation_system import top_k_indices
+
+# Catalogue sizes and query shape to benchmark
+CATALOGUE_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+N_SEEDS = 5
+TOP_N = 10
+REPEATS = 5
+
+
+# Time the fastest of a few runs of a function
+def best_time(func, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# Old path: one full stable sort per seed track
+def full_sort(scores, top_n):
+    return np.stack([np.argsort(-row, kind='stable')[:top_n] for row in scores])
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'tracks':>10} {'full sort (ms)':>15} {'argpartition (ms)':>18} {'speedup':>8}")
+    
+    for n_tracks in CATALOGUE_SIZES:
+        # Rounded scores so there are plenty of ties, like genre cosine similarities
+        scores = np.round(rng.random((N_SEEDS, n_tracks)), 2)
+        
+        assert np.array_equal(full_sort(scores, TOP_N), top_k_indices(scores, TOP_N))
+        
+        sort_time = best_time(lambda: full_sort(scores, TOP_N))
+        topk_time = best_time(lambda: top_k_indices(scores, TOP_N))
+        print(f"{n_tracks:>10} {sort_time * 1000:>15.2f} {topk_time * 1000:>18.2f} {sort_time / topk_time:>7.1f}x")
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
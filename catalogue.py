@@ -0,0 +1,89 @@
+#Python Script for the interned catalogue model used by the recommenders
+#Tracks, artists and albums get dense integer IDs (their row in the arrays below) mapped from Spotify IDs,
+#and genre sets are stored as uint64 bitmasks (bit i = genres_list[i], see genre_filter.py).
+
+#Import necessary libraries
+import numpy as np
+import pandas as pd
+from genre_filter import encode_genres
+from instrumentation import instrumented
+
+ID_COLUMNS = ['Track ID', 'Artist ID', 'Album ID']
+
+
+@instrumented
+def build_catalogue(df, genres_list):
+    """
+    Builds the integer-ID catalogue model of a prepared DataFrame.
+
+    Parameters:
+    - df (DataFrame): The dataset containing K-pop songs (e.g. the output of clean_and_prepare_data), every row with
+      a Track, Artist and Album ID (ValueError otherwise).
+    - genres_list (list): Genre vocabulary for the bitmasks (at most 64 genres).
+
+    Returns:
+    - catalogue (dict):
+      - 'genres', 'genre_positions': The vocabulary and genre -> bit lookup.
+      - 'track_ids', 'artist_ids', 'album_ids': Spotify IDs as pd.Index, position = dense ID (get_indexer for the reverse).
+      - 'track_names': Track name per dense track ID.
+      - 'track_rows': First df row of each track, 'track_artist' / 'track_album': dense IDs of that row.
+      - 'track_popularity': Highest Track Popularity of each track.
+      - 'track_followers': Highest Followers among the artists of each track.
+      - 'track_genres': Genre bitmask of each track (union over its rows).
+      - 'row_track', 'row_artist', 'row_genres': Dense track ID, dense artist ID and genre bitmask of every df row.
+      - 'name_to_tracks': Track name -> array of dense track IDs sharing that name.
+    """
+    # factorize codes a missing ID as -1, which the .at reductions below would fold into the last track
+    missing = df[ID_COLUMNS].isna().any(axis=1)
+    if missing.any():
+        raise ValueError(f"{missing.sum()} rows have no {' / '.join(ID_COLUMNS)}, drop them before building the catalogue")
+    
+    row_track, track_ids = pd.factorize(df['Track ID'])
+    row_artist, artist_ids = pd.factorize(df['Artist ID'])
+    row_album, album_ids = pd.factorize(df['Album ID'])
+    row_genres = encode_genres(df['Genres'], genres_list)
+    n_tracks = len(track_ids)
+    
+    # First row of every track, factorize numbers tracks in order of appearance
+    _, track_rows = np.unique(row_track, return_index=True)
+    
+    track_genres = np.zeros(n_tracks, dtype=np.uint64)
+    np.bitwise_or.at(track_genres, row_track, row_genres)
+    track_popularity = np.full(n_tracks, -np.inf)
+    np.maximum.at(track_popularity, row_track, df['Track Popularity'].to_numpy(dtype=float))
+    track_followers = np.full(n_tracks, -np.inf)
+    np.maximum.at(track_followers, row_track, df['Followers'].to_numpy(dtype=float))
+    
+    track_names = np.asarray(df['Track Name'].to_numpy(dtype=object)[track_rows])
+    
+    return {
+        'genres': list(genres_list),
+        'genre_positions': {genre: bit for bit, genre in enumerate(genres_list)},
+        'track_ids': pd.Index(track_ids),
+        'artist_ids': pd.Index(artist_ids),
+        'album_ids': pd.Index(album_ids),
+        'track_names': track_names,
+        'track_rows': track_rows,
+        'track_artist': row_artist[track_rows].astype(np.int32),
+        'track_album': row_album[track_rows].astype(np.int32),
+        'track_popularity': track_popularity,
+        'track_followers': track_followers,
+        'track_genres': track_genres,
+        'row_track': row_track.astype(np.int32),
+        'row_artist': row_artist.astype(np.int32),
+        'row_genres': row_genres,
+        'name_to_tracks': pd.Series(np.arange(n_tracks)).groupby(track_names).indices,
+    }
+
+
+# Dense track IDs for a list of track names (every version of a name), unknown names are skipped
+def tracks_for_names(catalogue, track_names):
+    empty = np.empty(0, dtype=np.intp)
+    ids = [catalogue['name_to_tracks'].get(name, empty) for name in track_names]
+    return np.concatenate(ids) if ids else empty
+
+
+# Unpack the genre bitmasks into a tracks x genres 0/1 matrix
+def genre_matrix(catalogue):
+    bits = np.arange(len(catalogue['genres']), dtype=np.uint64)
+    return ((catalogue['track_genres'][:, None] >> bits) & np.uint64(1)).astype(np.float64)
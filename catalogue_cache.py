@@ -0,0 +1,169 @@
+#Python Script for the on-disk catalogue cache
+#Writes the cleaned, deduplicated catalogue as memory-mapped NumPy columns plus a string table,
+#keyed by a content hash of the source CSVs. Can be ran individually to (re)build the cache.
+
+#Import necessary libraries
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from data_processing import read_table, iter_prepared_data, TRACK_CHUNK_SIZE
+from instrumentation import instrumented
+
+CACHE_DIR = 'data/cache'
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 2  # Bump when the preparation steps change the catalogue
+
+
+# Content hash of the source files
+def source_hash(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# Same preparation steps as the app: clean, merge and remove duplicates.
+# Tracks are streamed in batches and deduplicated as they come, so the exploded join never exists in full.
+@instrumented
+def prepare_catalogue(artists_file, tracks_file, genres_list, chunk_size=TRACK_CHUNK_SIZE):
+    subset = ['Track Name', 'Track ID', 'URI']
+    artists_df = read_table(artists_file)
+    chunks = [
+        combined_df.drop_duplicates(subset=subset, keep='first')
+        for combined_df in iter_prepared_data(artists_df, tracks_file, genres_list, chunk_size)
+    ]
+    combined_df = pd.concat(chunks, ignore_index=True)
+    return combined_df.drop_duplicates(subset=subset, keep='first').reset_index(drop=True)
+
+
+# String column -> int32 codes plus a table of unique strings (utf-8 blob and offsets)
+def _write_string_column(path, values):
+    codes, uniques = pd.factorize(values)
+    encoded = [str(value).encode('utf-8') for value in uniques]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    np.save(f'{path}.codes.npy', codes.astype(np.int32))
+    np.save(f'{path}.offsets.npy', offsets)
+    np.save(f'{path}.strings.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+
+
+def _read_string_column(path):
+    codes = np.load(f'{path}.codes.npy', mmap_mode='r')
+    offsets = np.load(f'{path}.offsets.npy')
+    blob = np.load(f'{path}.strings.npy').tobytes()
+    uniques = [blob[start:stop].decode('utf-8') for start, stop in zip(offsets[:-1], offsets[1:])]
+    return pd.Categorical.from_codes(codes, categories=uniques)
+
+
+@instrumented
+def build_catalogue_cache(artists_file, tracks_file, genres_list, cache_dir=CACHE_DIR):
+    """
+    Builds the columnar catalogue cache from the source CSVs.
+
+    Parameters:
+    - artists_file (str): Path to all_artists_data.csv (or a Parquet file).
+    - tracks_file (str): Path to all_tracks_data.csv (or a Parquet file).
+    - genres_list (list): Genres kept by clean_and_prepare_data.
+    - cache_dir (str): Directory for the cache files (default is data/cache).
+
+    Returns:
+    - manifest (dict): Source hash, genres, row count and column layout of the cache.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    # The manifest is written last, so a half-written cache is never picked up
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    
+    df = prepare_catalogue(artists_file, tracks_file, genres_list)
+    columns = []
+    for position, column in enumerate(df.columns):
+        path = os.path.join(cache_dir, f'col{position:03d}')
+        if pd.api.types.is_numeric_dtype(df[column]):
+            np.save(f'{path}.npy', df[column].to_numpy())
+            columns.append({'name': column, 'file': os.path.basename(path), 'kind': 'numeric'})
+        else:
+            _write_string_column(path, df[column])
+            columns.append({'name': column, 'file': os.path.basename(path), 'kind': 'string'})
+    
+    manifest = {
+        'version': CACHE_VERSION,
+        'source_hash': source_hash(artists_file, tracks_file),
+        'genres': list(genres_list),
+        'rows': len(df),
+        'columns': columns,
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Catalogue cache written to {cache_dir} ({len(df)} rows)")
+    return manifest
+
+
+@instrumented
+def load_catalogue_cache(cache_dir=CACHE_DIR):
+    """
+    Loads the cached catalogue. Numeric columns and string codes are memory-mapped, not parsed.
+
+    Parameters:
+    - cache_dir (str): Directory of the cache files (default is data/cache).
+
+    Returns:
+    - df (DataFrame): The cleaned catalogue, string columns as categoricals.
+    """
+    with open(os.path.join(cache_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    
+    data = {}
+    for column in manifest['columns']:
+        path = os.path.join(cache_dir, column['file'])
+        if column['kind'] == 'numeric':
+            data[column['name']] = np.load(f'{path}.npy', mmap_mode='r')
+        else:
+            data[column['name']] = _read_string_column(path)
+    return pd.DataFrame(data, copy=False)
+
+
+def load_or_build_catalogue(artists_file, tracks_file, genres_list, cache_dir=CACHE_DIR):
+    """
+    Loads the catalogue from the cache, rebuilding it only when the source CSVs or genres changed.
+
+    Parameters:
+    - artists_file (str): Path to all_artists_data.csv (or a Parquet file).
+    - tracks_file (str): Path to all_tracks_data.csv (or a Parquet file).
+    - genres_list (list): Genres kept by clean_and_prepare_data.
+    - cache_dir (str): Directory for the cache files (default is data/cache).
+
+    Returns:
+    - df (DataFrame): The cleaned, deduplicated catalogue.
+    """
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if (manifest.get('version') == CACHE_VERSION and manifest['source_hash'] == source_hash(artists_file, tracks_file)
+                and manifest['genres'] == list(genres_list)):
+            return load_catalogue_cache(cache_dir)
+    
+    build_catalogue_cache(artists_file, tracks_file, genres_list, cache_dir)
+    return load_catalogue_cache(cache_dir)
+
+
+# Main function to (re)build the cache
+def main():
+    artists_file = 'data/all_artists_data.csv'
+    tracks_file = 'data/all_tracks_data.csv'
+    
+    genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+                   'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+                   'trot', 'k-pop ballad', 'korean soundtrack']
+    
+    build_catalogue_cache(artists_file, tracks_file, genres_list)
+
+
+# Run the script
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#Python Script for the typed crawl output format
+#data_retrieve writes crawl partitions as zstd-compressed Parquet files with this schema: typed numeric columns,
+#genres and credited artist IDs as lists of dictionary-encoded strings, and a schema version in the file metadata.
+#pyarrow is only imported when a schema is built, CSV crawls and CSV loading work without it.
+
+#Import necessary libraries
+import importlib.util
+
+SCHEMA_VERSION = 1  # Bump when a column is added, removed or retyped
+VERSION_KEY = b'kpop.schema_version'
+DATA_TYPE_KEY = b'kpop.data_type'
+ROW_GROUP_SIZE = 10_000  # Rows buffered per written file and row group
+
+# CSV output columns, in the order data_retrieve.fetch_data_by_genre builds them (track rows also carry 'Artist IDs', Parquet only)
+ARTIST_COLUMNS = ['Artist Name', 'Artist ID', 'Popularity', 'Followers', 'Genres', 'Genre Queried', 'Artist Image']
+TRACK_COLUMNS = ['Track Name', 'Track ID', 'Duration (ms)', 'Popularity', 'Track Number', 'URI', 'Album Name',
+                 'Album ID', 'Artists', 'Genre Queried', 'Track Image']
+LIST_COLUMNS = ['Genres', 'Artists']  # ', '-joined in CSV files
+
+# (column, type) per data type; 'dict' = dictionary-encoded string, 'list<dict>' = list of them
+COLUMN_TYPES = {
+    'artist': [('Artist Name', 'string'), ('Artist ID', 'string'), ('Popularity', 'int16'), ('Followers', 'int64'),
+               ('Genres', 'list<dict>'), ('Genre Queried', 'dict'), ('Artist Image', 'string')],
+    'track': [('Track Name', 'string'), ('Track ID', 'string'), ('Duration (ms)', 'int32'), ('Popularity', 'int16'),
+              ('Track Number', 'int16'), ('URI', 'string'), ('Album Name', 'string'), ('Album ID', 'string'),
+              ('Artists', 'list<string>'), ('Artist IDs', 'list<dict>'), ('Genre Queried', 'dict'), ('Track Image', 'string')],
+}
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def arrow_schema(data_type):
+    """
+    Arrow schema of one data type, with the schema version in its metadata.
+
+    Parameters:
+    - data_type (str): 'artist' or 'track'.
+
+    Returns:
+    - schema (pyarrow.Schema): Schema of the crawl partitions.
+    """
+    import pyarrow as pa
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    types = {
+        'string': pa.string(),
+        'int16': pa.int16(),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'dict': dictionary,
+        'list<string>': pa.list_(pa.string()),
+        'list<dict>': pa.list_(dictionary),
+    }
+    return pa.schema([(column, types[type_name]) for column, type_name in COLUMN_TYPES[data_type]],
+                     metadata={VERSION_KEY: str(SCHEMA_VERSION).encode(), DATA_TYPE_KEY: data_type.encode()})
+
+
+# Raise on files written by a newer crawler, whose columns this code does not know
+def check_schema_version(schema, path):
+    version = int((schema.metadata or {}).get(VERSION_KEY, b'0'))
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"{path} has crawl schema version {version}, this code reads up to {SCHEMA_VERSION}")
+    return version
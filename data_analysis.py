@@ -0,0 +1,102 @@
+#Python Script for data analysis: plots of artists, albums and tracks
+#Every chart reads the deduplicated summary tables of analytics_cube.py; the cube is built with one pass over
+#the data and reused from data/cache/analytics. The functions also accept a clean_and_prepare_data frame.
+#Can be ran individually.
+
+#Import necessary libraires
+import pandas as pd
+from plotly.subplots import make_subplots
+import plotly.express as px
+from analytics_cube import build_analytics_cube, load_or_build_analytics_cube
+
+
+# Analytics cube of the data: the cube itself, or one built from a prepared DataFrame
+def _as_cube(data):
+    return build_analytics_cube(data) if isinstance(data, pd.DataFrame) else data
+
+# Plotting function for Artist Comparison
+def plot_artists_comparison(data, genre, top_n=10):
+    artist_genres = _as_cube(data)['artist_genres']
+    genre_df = artist_genres[artist_genres['Genre'] == genre]
+    
+    # Top artists by followers
+    top_artists_followers = genre_df.nlargest(top_n, 'Followers')
+    fig_followers = px.bar(top_artists_followers, x='Artist Name', y='Followers', color='Followers')
+    
+    # Top artists by popularity
+    top_artists_popularity = genre_df.nlargest(top_n, 'Artist Popularity')
+    fig_popularity = px.bar(top_artists_popularity, x='Artist Name', y='Artist Popularity', color='Artist Popularity')
+    
+    # Create subplots for comparison
+    fig = make_subplots(rows=1, cols=2)
+    for trace in fig_followers.data:
+        fig.add_trace(trace, row=1, col=1)
+    for trace in fig_popularity.data:
+        fig.add_trace(trace, row=1, col=2)
+    
+    fig.update_layout(title=f'{genre} - Top Artists Comparison - Followers V/S Popularity')
+    fig.show()
+    
+
+# Plot top artists by album popularity (average popularity of their tracks, each track counted once)
+def plot_top_artists_by_album_popularity(data):
+    top_artists = _as_cube(data)['artists'].nlargest(10, 'Average Track Popularity')
+    fig = px.bar(top_artists, x='Artist Name', y='Average Track Popularity', color='Artist Name',
+                 hover_data=['Top Track', 'Top Track Album', 'Top Track Popularity'], title='Top 10 Artists by Popular Albums')
+    fig.show()
+    
+# Function to calculate number of tracks in an album
+def calculate_tracks_per_album(data):
+    albums = _as_cube(data)['albums']
+    return albums[['Album Name', 'Tracks']].rename(columns={'Tracks': 'Number of Tracks'})
+
+# Plot top albums by track popularity
+def plot_top_albums_by_track_popularity(data):
+    top_albums = _as_cube(data)['albums'].nlargest(10, 'Average Track Popularity')
+    
+    fig = px.bar(top_albums, x='Album Name', y='Average Track Popularity', color='Album Name',
+                 title='Top 10 Albums by Popular Tracks')
+    fig.show()
+
+# Plot top artists by followers
+def plot_top_artists_by_followers(data):
+    top_artists_followers = _as_cube(data)['artists'].nlargest(10, 'Followers')
+    
+    fig = px.bar(top_artists_followers, x='Artist Name', y='Followers', color='Artist Name',
+                 title='Top 10 Artists by Followers')
+    fig.show()
+    
+    
+# Main function to execute the entire workflow
+def main():
+    # Define file paths
+    artists_file = 'data/all_artists_data.csv'
+    tracks_file = 'data/all_tracks_data.csv'
+    
+    # Define genres list
+    genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+                   'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
+                   'trot', 'k-pop ballad', 'korean soundtrack']
+    
+    # Load, clean and aggregate the data in one pass (reused from data/cache/analytics when unchanged)
+    cube = load_or_build_analytics_cube(artists_file, tracks_file, genres_list)
+    
+    # Data visualization
+    for genre in genres_list:
+        plot_artists_comparison(cube, genre, top_n=10)
+    
+    # Plot top artists by album popularity
+    plot_top_artists_by_album_popularity(cube)
+     
+    # Plot top albums by track popularity
+    plot_top_albums_by_track_popularity(cube)
+    
+    # Plot top artists by followers
+    plot_top_artists_by_followers(cube)
+    
+
+# Run the script
+if __name__ == "__main__":
+    main()
+
+
@@ -1,134 +1,198 @@
-#Python Script for data processing and analysis
-#Can be ran individually.
+#Python Script for data processing: loading, cleaning and preparing the data
+#Can be ran individually (runs the analysis in data_analysis.py). The plots live in data_analysis.py,
+#so loading data never imports the plotting libraries.
+#Reads CSV files and the typed Parquet crawl partitions of data_retrieve (pyarrow is imported only for those).
 
 #Import necessary libraires
 import os
+import glob
 import pandas as pd 
-import numpy as np 
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
+from instrumentation import instrumented
+from crawl_schema import check_schema_version
+
+
+def _is_parquet(path):
+    return path.endswith('.parquet')
+
+
+def _parquet_file(path):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    check_schema_version(parquet_file.schema_arrow, path)
+    return parquet_file
+
+
+# One CSV or Parquet file as a DataFrame; Parquet list columns come back as arrays, no string splitting
+def read_table(path):
+    if _is_parquet(path):
+        return _parquet_file(path).read().to_pandas()
+    return pd.read_csv(path)
+
+
+# Batches of a CSV or Parquet file
+def iter_table(path, chunk_size):
+    if _is_parquet(path):
+        return (batch.to_pandas() for batch in _parquet_file(path).iter_batches(batch_size=chunk_size))
+    return pd.read_csv(path, chunksize=chunk_size)
+
 
 # Data Loading
+@instrumented
 def load_data(artists_file, tracks_file):
-    artists_df = pd.read_csv(artists_file)
-    tracks_df = pd.read_csv(tracks_file)
+    artists_df = read_table(artists_file)
+    tracks_df = read_table(tracks_file)
     return artists_df, tracks_df
 
+# Partition files of one data type ('artist' or 'track') of an incremental crawl, oldest run first
+def crawl_partition_files(crawl_dir, data_type):
+    return sorted(glob.glob(os.path.join(crawl_dir, data_type, 'part-*.csv')) +
+                  glob.glob(os.path.join(crawl_dir, data_type, 'part-*.parquet')))
+
+# Load the append-only partitions of an incremental crawl (data_retrieve.crawl_genres), latest row per ID wins
+def load_crawl_partitions(crawl_dir='data/crawl'):
+    frames = []
+    for data_type, id_column in [('artist', 'Artist ID'), ('track', 'Track ID')]:
+        files = crawl_partition_files(crawl_dir, data_type)
+        df = pd.concat([read_table(f) for f in files], ignore_index=True) if files else pd.DataFrame()
+        frames.append(df.drop_duplicates(subset=id_column, keep='last').reset_index(drop=True) if files else df)
+    return frames[0], frames[1]
+
 # Data Cleaning and Preparation
-def clean_and_prepare_data(artists_df, tracks_df, genres_list):
-    # Fill NaN and explode genres
-    artists_df['Genres'] = artists_df['Genres'].fillna('')
-    artists_df['Genres'] = artists_df['Genres'].str.split(', ')
-    artists_df = artists_df.explode('Genres')
+# Tracks are joined to artists in bounded batches: credited artist IDs (or names) -> artist rows exploded by genre
+TRACK_CHUNK_SIZE = 50_000
+
+
+# List column: ', '-joined strings (CSV) are split, lists and arrays (Parquet) are kept as they are
+def _split_lists(values):
+    text = values.apply(isinstance, args=(str,))
+    if not text.any():
+        return values
+    return values.mask(text, values[text].str.split(', '))
+
+
+@instrumented
+def build_artist_lookup(artists_df, genres_list):
+    """
+    Builds the artist side of the track/artist join once.
+
+    Parameters:
+    - artists_df (DataFrame): Artists as retrieved (all_artists_data.csv), not modified.
+    - genres_list (list): Genres to keep.
+
+    Returns:
+    - lookup (dict):
+      - 'names': Artist Name -> Artist ID pairs (one row per pair), 'name_index': the distinct names.
+      - 'artists': Artist rows keyed by Artist ID, one row per kept genre, with the artist columns renamed.
+    """
+    # Explode genres
+    artists = artists_df.assign(Genres=_split_lists(artists_df['Genres'])).explode('Genres')
     
     # Filter for specific genres
-    artists_df = artists_df[artists_df['Genres'].isin(genres_list)]
-    
-    # Merge tracks and artists data
-    tracks_df.rename(columns={'Artists': 'Artist Name'}, inplace=True)
-    combined_df = pd.merge(tracks_df, artists_df, on='Artist Name', how='inner')
-    
-    # Rename columns for clarity
-    combined_df.rename(columns={
-        'Popularity_x': 'Track Popularity',
-        'Popularity_y': 'Artist Popularity',
-        'Genre Queried_x': 'Track GQ',
-        'Genre Queried_y': 'Artist GQ'
-    }, inplace=True)
-    
+    artists = artists[artists['Genres'].isin(genres_list)]
+    artists = artists.rename(columns={'Popularity': 'Artist Popularity', 'Genre Queried': 'Artist GQ'})
+    
+    names = artists[['Artist Name', 'Artist ID']].drop_duplicates().reset_index(drop=True)
+    return {
+        'names': names,
+        'name_index': pd.Index(names['Artist Name'].unique()),
+        'artists': artists.drop(columns='Artist Name').reset_index(drop=True),
+    }
+
+
+# Credited artist names -> (track, Artist Name, Artist ID) rows, for rows without artist IDs
+def _tracks_by_name(tracks, lookup):
+    # A CSV 'Artists' string joins every credited artist with ', ', unless the whole string is one artist's name.
+    # Parquet rows already hold a list of names.
+    credits = tracks['Artists'].fillna('').astype(object)
+    text = credits.apply(isinstance, args=(str,))
+    joined = credits[text]
+    multi = joined.str.contains(', ', regex=False) & (lookup['name_index'].get_indexer(joined) < 0)
+    names = credits.mask(text, joined.mask(multi, joined[multi].str.split(', ')))
+    tracks = tracks.assign(Artists=names).explode('Artists').rename(columns={'Artists': 'Artist Name'})
+    return tracks.merge(lookup['names'], on='Artist Name', how='inner')
+
+
+# Credited artist IDs (Parquet crawls) -> the same rows, without matching names
+def _tracks_by_id(tracks, lookup):
+    columns = [column if column != 'Artists' else 'Artist Name' for column in tracks.columns if column != 'Artist ID'] + ['Artist ID']
+    tracks = tracks.drop(columns='Artists').explode('Artist ID')
+    names = lookup['names'].drop_duplicates('Artist ID')
+    return tracks.merge(names, on='Artist ID', how='inner')[columns]
+
+
+# One batch of tracks joined to the artist lookup, one row per (track, credited artist row, genre)
+@instrumented
+def _prepare_tracks(tracks_df, lookup):
+    tracks = tracks_df.rename(columns={'Popularity': 'Track Popularity', 'Genre Queried': 'Track GQ', 'Artist IDs': 'Artist ID'})
+    
+    # Rows with credited artist IDs join on them, older rows (NaN IDs) match the credited names
+    if 'Artist ID' in tracks.columns:
+        by_id = tracks['Artist ID'].notna()
+        joined = [_tracks_by_id(tracks[by_id], lookup)]
+        if not by_id.all():
+            joined.append(_tracks_by_name(tracks[~by_id].drop(columns='Artist ID'), lookup))
+        tracks = pd.concat(joined, ignore_index=True) if len(joined) > 1 else joined[0]
+    else:
+        tracks = _tracks_by_name(tracks, lookup)
+    
+    # Merge tracks and artists data through the artist IDs, rows without a track or album ID are dropped
+    tracks = tracks.dropna(subset=['Track ID', 'Album ID'])
+    return tracks.merge(lookup['artists'], on='Artist ID', how='inner')
+
+
+def iter_prepared_data(artists_df, tracks, genres_list, chunk_size=TRACK_CHUNK_SIZE):
+    """
+    Cleans and joins tracks with their artists batch by batch.
+
+    Parameters:
+    - artists_df (DataFrame): Artists as retrieved.
+    - tracks (DataFrame or str): Tracks as retrieved, or the path of a CSV or Parquet file to read in chunks.
+    - genres_list (list): Genres to keep.
+    - chunk_size (int): Track rows per batch, memory use is bounded by the batch and the artist lookup.
+
+    Yields:
+    - combined_df (DataFrame): Prepared rows of one batch of tracks, same columns as clean_and_prepare_data.
+    """
+    lookup = build_artist_lookup(artists_df, genres_list)
+    if isinstance(tracks, str):
+        chunks = iter_table(tracks, chunk_size)
+    else:
+        chunks = (tracks.iloc[start:start + chunk_size] for start in range(0, len(tracks), chunk_size))
+    for chunk in chunks:
+        yield _prepare_tracks(chunk, lookup)
+
+
+@instrumented
+def clean_and_prepare_data(artists_df, tracks_df, genres_list, chunk_size=TRACK_CHUNK_SIZE):
+    # Multi-artist tracks match every credited artist, the input frames are left unchanged
+    combined_df = pd.concat(list(iter_prepared_data(artists_df, tracks_df, genres_list, chunk_size)), ignore_index=True)
     return combined_df
 
-# Plotting function for Artist Comparison
-def plot_artists_comparison(df, genre, top_n=10):
-    genre_df = df[df['Genres'] == genre]
-    
-    # Top artists by followers
-    top_artists_followers = genre_df.nlargest(top_n, 'Followers')
-    fig_followers = px.bar(top_artists_followers, x='Artist Name', y='Followers', color='Followers')
-    
-    # Top artists by popularity
-    top_artists_popularity = genre_df.nlargest(top_n, 'Artist Popularity')
-    fig_popularity = px.bar(top_artists_popularity, x='Artist Name', y='Artist Popularity', color='Artist Popularity')
-    
-    # Create subplots for comparison
-    fig = make_subplots(rows=1, cols=2)
-    for trace in fig_followers.data:
-        fig.add_trace(trace, row=1, col=1)
-    for trace in fig_popularity.data:
-        fig.add_trace(trace, row=1, col=2)
-    
-    fig.update_layout(title=f'{genre} - Top Artists Comparison - Followers V/S Popularity')
-    fig.show()
-    
 
-# Plot top artists by album popularity
-def plot_top_artists_by_album_popularity(df):
-    artist_popularity = df.groupby('Artist Name')['Track Popularity'].mean().reset_index(name='Average Track Popularity')
-    most_popular_tracks = df.loc[df.groupby('Artist Name')['Track Popularity'].idxmax()][['Artist Name', 'Track Name', 'Album Name', 'Track Popularity']]
-    artist_info = pd.merge(artist_popularity, most_popular_tracks, on='Artist Name')
-    top_artists = artist_info.nlargest(10, 'Average Track Popularity')
-    fig = px.bar(top_artists, x='Artist Name', y='Average Track Popularity', color='Artist Name',title='Top 10 Artists by Popular Albums')
-    fig.show()
-    
-# Function to calculate number of tracks in an album
-def calculate_tracks_per_album(df):
-    return df.groupby('Album Name')['Track Name'].count().reset_index(name='Number of Tracks')
-
-# Plot top albums by track popularity
-def plot_top_albums_by_track_popularity(df):
-    album_popularity = df.groupby('Album Name')['Track Popularity'].mean().reset_index(name='Average Track Popularity')
-    top_albums = album_popularity.nlargest(10, 'Average Track Popularity')
-    
-    fig = px.bar(top_albums, x='Album Name', y='Average Track Popularity', color='Album Name',
-                 title='Top 10 Albums by Popular Tracks')
-    fig.show()
-
-# Plot top artists by followers
-def plot_top_artists_by_followers(df):
-    followers_per_artist = df.groupby('Artist Name')['Followers'].mean().reset_index(name='Average Followers')
-    top_artists_followers = followers_per_artist.nlargest(10, 'Average Followers')
-    
-    fig = px.bar(top_artists_followers, x='Artist Name', y='Average Followers', color='Artist Name',
-                 title='Top 10 Artists by Followers')
-    fig.show()
-    
-    
-# Main function to execute the entire workflow
-def main():
-    # Define file paths
-    artists_file = 'data/all_artists_data.csv'
-    tracks_file = 'data/all_tracks_data.csv'
-    
-    # Load data
-    artists_df, tracks_df = load_data(artists_file, tracks_file)
-    
-    # Define genres list
-    genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
-                   'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie', 
-                   'trot', 'k-pop ballad', 'korean soundtrack']
-    
-    # Clean and prepare data
-    combined_df = clean_and_prepare_data(artists_df, tracks_df, genres_list)
-    
-    # Data visualization
-    for genre in genres_list:
-        plot_artists_comparison(combined_df, genre, top_n=10)
-    
-    # Plot top artists by album popularity
-    plot_top_artists_by_album_popularity(combined_df)
-     
-    # Plot top albums by track popularity
-    plot_top_albums_by_track_popularity(combined_df)
-    
-    # Plot top artists by followers
-    plot_top_artists_by_followers(combined_df)
-    
+# Stream the normalised track-genre table (Track ID, Artist ID, Genre) to a CSV file.
+# Pairs are unique within a batch, a track repeated in a later batch (another Genre Queried) repeats its pairs.
+def write_track_genres(artists_df, tracks, genres_list, output_file, chunk_size=TRACK_CHUNK_SIZE):
+    rows = 0
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_prepared_data(artists_df, tracks, genres_list, chunk_size)):
+            pairs = chunk[['Track ID', 'Artist ID', 'Genres']].drop_duplicates().rename(columns={'Genres': 'Genre'})
+            pairs.to_csv(f, header=(i == 0), index=False)
+            rows += len(pairs)
+    return rows
+
+
+# The plotting functions used to live here, they are imported from data_analysis.py on first use
+_ANALYSIS_FUNCTIONS = {'plot_artists_comparison', 'plot_top_artists_by_album_popularity', 'calculate_tracks_per_album',
+                       'plot_top_albums_by_track_popularity', 'plot_top_artists_by_followers'}
+
+def __getattr__(name):
+    if name in _ANALYSIS_FUNCTIONS:
+        import data_analysis
+        return getattr(data_analysis, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Run the script
 if __name__ == "__main__":
+    from data_analysis import main
     main()
-
-
@@ -2,24 +2,44 @@
 
 #Import libraries 
 import requests
+from requests.adapters import HTTPAdapter
 import base64
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-import pandas as pd
 import os
+import csv
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit, unquote
+from email.utils import parsedate_to_datetime
+from crawl_schema import arrow_schema, parquet_available, ROW_GROUP_SIZE, ARTIST_COLUMNS, TRACK_COLUMNS, LIST_COLUMNS
 
 # Initalize the values 
 CLIENT_ID = "client id" # Replace with your Spotify API client ID
 CLIENT_SECRET = "client secre"  # Replace with your Spotify API client secret   
 
+# Spotify endpoints (point these at mock_spotify_server.py to test offline)
+TOKEN_URL = 'https://accounts.spotify.com/api/token'
+SEARCH_URL = 'https://api.spotify.com/v1/search'
+
+# Crawl settings
+MAX_WORKERS = 8  # (genre, type) searches fetched at the same time
+MAX_REQUESTS_PER_HOST = 4  # Requests in flight per host
+MAX_RETRIES = 5  # Retries per page on 429, 5xx and expired tokens
+
+# Incremental crawl output: checkpoints, dedup logs and append-only partitions per type
+CRAWL_DIR = 'data/crawl'
+OUTPUT_FORMAT = 'parquet'  # Typed Parquet partitions (crawl_schema.py), 'csv' for the untyped format
+ID_COLUMNS = {'artist': 'Artist ID', 'track': 'Track ID'}
+
 #Authenticate the secret 
-def get_access_token(client_id, client_secret):
+def get_access_token(client_id, client_secret, token_url=TOKEN_URL, session=None):
     # Encode client_id and client_secret for Base64
     credentials = f"{client_id}:{client_secret}"
     credentials_base64 = base64.b64encode(credentials.encode()).decode()
     
-    # Token request URL and headers
-    token_url = 'https://accounts.spotify.com/api/token'
+    # Token request headers
     headers = {
         'Authorization': f'Basic {credentials_base64}',
         'Content-Type': 'application/x-www-form-urlencoded'
@@ -29,86 +49,462 @@ def get_access_token(client_id, client_secret):
     }
     
     # Make the request for the access token
-    response = requests.post(token_url, data=data, headers=headers)
+    response = (session or requests).post(token_url, data=data, headers=headers, timeout=30)
     
-    # Print status code and response text for debugging
+    # Print status code for debugging
     print(f"Status Code: {response.status_code}")
-    print(f"Response Text: {response.text}")
     
     if response.status_code == 200:
         access_token = response.json()['access_token']
         print("Access token obtained successfully.")
         return access_token
     else:
-        print("Access token not obtained.")
-        exit()
+        print(f"Response Text: {response.text}")
+        raise RuntimeError(f"Access token not obtained (status {response.status_code}).")
 
-#Function to fetch data by genre
-def fetch_data_by_genre(genre, access_token, data_type):
-    base_url = f'https://api.spotify.com/v1/search'
-    headers = {'Authorization': f'Bearer {access_token}'}
+
+# Seconds to wait from a Retry-After header, given as seconds or as an HTTP-date; default when missing or unreadable
+def retry_after_seconds(value, default):
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return default
+
+
+# Shared HTTP client for the crawl: pooled session, per-host concurrency limit, 429 backoff and token refresh
+class SpotifyClient:
+    def __init__(self, client_id, client_secret, token_url=TOKEN_URL, max_workers=MAX_WORKERS,
+                 max_requests_per_host=MAX_REQUESTS_PER_HOST, max_retries=MAX_RETRIES, recordings=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.max_requests_per_host = max_requests_per_host
+        self.max_retries = max_retries
+        self.recordings = recordings  # Optional dict filled with responses, for mock_spotify_server.py
+        self.access_token = None
+        
+        # Keep-alive connections shared by all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self._paused_until = 0.0
+    
+    # Fetch a new token unless another thread already replaced the stale one
+    def refresh_token(self, stale_token=None):
+        with self._lock:
+            if self.access_token is None or self.access_token == stale_token:
+                self.access_token = get_access_token(self.client_id, self.client_secret, self.token_url, self.session)
+            return self.access_token
+    
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self._host_limits[host]
+    
+    # A 429 pauses every worker, the rate limit is per application not per request
+    def _pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
     
+    def _wait_for_pause(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def get(self, url):
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_pause()
+            # Read after every pause, another worker may have refreshed the token meanwhile
+            token = self.access_token or self.refresh_token()
+            with self._host_limit(url):
+                response = self.session.get(url, headers={'Authorization': f'Bearer {token}'}, timeout=30)
+            
+            if response.status_code == 200:
+                results = response.json()
+                if self.recordings is not None:
+                    parts = urlsplit(url)
+                    self.recordings[unquote(f'{parts.path}?{parts.query}')] = results
+                return results
+            if response.status_code == 401:
+                token = self.refresh_token(token)
+            elif response.status_code == 429 or response.status_code >= 500:
+                # Out of retries: give up without pausing the other workers for a request nobody will send
+                if attempt == self.max_retries:
+                    break
+                self._pause(retry_after_seconds(response.headers.get('Retry-After'), 2 ** attempt))
+            else:
+                break
+        
+        print(f"Error: {response.status_code}, {response.text}")
+        return None
+
+
+# Row with its list columns ', '-joined, as stored in CSV files
+def _csv_row(row):
+    return {column: ', '.join(value) if column in LIST_COLUMNS and isinstance(value, list) else value
+            for column, value in row.items()}
+
+
+# Write rows to a CSV file as they arrive, shared by worker threads (appends to an existing file).
+# The file is opened on the first row, a run without new rows leaves no empty partition behind.
+class CsvStream:
+    def __init__(self, filename, columns):
+        self.filename = filename
+        self.columns = columns
+        self.file = None
+        self.writer = None
+        self.rows = 0
+        self._lock = threading.Lock()
+    
+    def _open(self):
+        write_header = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+        self.file = open(self.filename, 'a', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+        if write_header:
+            self.writer.writeheader()
+    
+    # on_written runs once the rows are on disk (right away for CSV)
+    def write_rows(self, rows, on_written=None):
+        with self._lock:
+            if rows:
+                if self.file is None:
+                    self._open()
+                self.writer.writerows(_csv_row(row) for row in rows)
+                self.file.flush()
+                self.rows += len(rows)
+            if on_written:
+                on_written()
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+# Write rows to typed Parquet files as they arrive, shared by worker threads.
+# Rows are buffered and written as one complete file per row group (<prefix>-00000.parquet, ...), so memory is
+# bounded by row_group_size and a crash never leaves a file without its footer. The on_written callbacks
+# (checkpoints) of buffered rows run only after their file is written.
+class ParquetStream:
+    def __init__(self, prefix, data_type, row_group_size=ROW_GROUP_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa, self._pq = pa, pq
+        self.schema = arrow_schema(data_type)
+        self.prefix = prefix
+        self.filename = f'{prefix}-*.parquet'
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._buffer = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+        # A resumed run continues the numbering of its files
+        directory, name = os.path.split(prefix)
+        self._next_file = len([f for f in os.listdir(directory) if f.startswith(f'{name}-') and f.endswith('.parquet')])
+    
+    def write_rows(self, rows, on_written=None):
+        with self._lock:
+            self._buffer.extend(rows)
+            if on_written:
+                self._callbacks.append(on_written)
+            if len(self._buffer) >= self.row_group_size:
+                self._flush()
+            elif not self._buffer:
+                self._run_callbacks()
+    
+    def _run_callbacks(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+    
+    def _flush(self):
+        if self._buffer:
+            table = self._pa.Table.from_pylist(self._buffer, schema=self.schema)
+            filename = f'{self.prefix}-{self._next_file:05d}.parquet'
+            self._pq.write_table(table, filename + '.tmp', compression='zstd', row_group_size=self.row_group_size)
+            os.replace(filename + '.tmp', filename)
+            self._next_file += 1
+            self.rows += len(self._buffer)
+            self._buffer = []
+        self._run_callbacks()
+    
+    def close(self):
+        with self._lock:
+            self._flush()
+
+
+# Hash of the row content, without the genre it was found under.
+# Hashed in the CSV layout so dedup logs from earlier crawls stay valid.
+def row_hash(row):
+    content = {column: value for column, value in _csv_row(row).items() if column not in ('Genre Queried', 'Artist IDs')}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+# Checkpoints per (genre, type) and the ID -> row hash dedup set of an incremental crawl
+class CrawlState:
+    def __init__(self, crawl_dir=CRAWL_DIR):
+        self.crawl_dir = crawl_dir
+        self.checkpoint_file = os.path.join(crawl_dir, 'checkpoints.json')
+        self._lock = threading.Lock()
+        os.makedirs(crawl_dir, exist_ok=True)
+        
+        if os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file) as f:
+                self.checkpoints = json.load(f)
+        else:
+            self.checkpoints = {'run_id': None, 'jobs': {}}
+        
+        # Append-only logs of "id<TAB>hash", the last line for an ID wins
+        self.seen = {}
+        self.seen_this_run = {data_type: set() for data_type in ID_COLUMNS}
+        for data_type in ID_COLUMNS:
+            self.seen[data_type] = {}
+            log_file = self._seen_file(data_type)
+            if os.path.exists(log_file):
+                with open(log_file, encoding='utf-8') as f:
+                    for line in f:
+                        item_id, _, digest = line.rstrip('\n').partition('\t')
+                        self.seen[data_type][item_id] = digest
+    
+    def _seen_file(self, data_type):
+        return os.path.join(self.crawl_dir, f'seen_{data_type}.tsv')
+    
+    # Partition of this run: a CSV file, or the file name prefix of the Parquet files
+    def partition_file(self, data_type, output_format='csv'):
+        os.makedirs(os.path.join(self.crawl_dir, data_type), exist_ok=True)
+        name = f"part-{self.checkpoints['run_id']}"
+        return os.path.join(self.crawl_dir, data_type, name if output_format == 'parquet' else f'{name}.csv')
+    
+    def _save_checkpoints(self):
+        tmp_file = self.checkpoint_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self.checkpoints, f, indent=2)
+        os.replace(tmp_file, self.checkpoint_file)
+    
+    # Resume the unfinished run, or start a new one once every job is done
+    def start_run(self, jobs):
+        keys = [f'{data_type}|{genre}' for genre, data_type in jobs]
+        job_states = self.checkpoints['jobs']
+        unfinished = [key for key in keys if key in job_states and not job_states[key]['done']]
+        if self.checkpoints['run_id'] is None or not unfinished:
+            self.checkpoints = {'run_id': time.strftime('%Y%m%d%H%M%S'), 'jobs': {}}
+            print(f"Starting crawl run {self.checkpoints['run_id']}")
+        else:
+            print(f"Resuming crawl run {self.checkpoints['run_id']} ({len(unfinished)} unfinished searches)")
+        for key in keys:
+            self.checkpoints['jobs'].setdefault(key, {'next': None, 'done': False, 'pages': 0})
+        self._save_checkpoints()
+    
+    def pending_jobs(self, jobs):
+        return [(genre, data_type) for genre, data_type in jobs if not self.checkpoints['jobs'][f'{data_type}|{genre}']['done']]
+    
+    # Checkpointed page on the current search endpoint's host
+    def start_url(self, genre, data_type, search_url=SEARCH_URL):
+        next_url = self.checkpoints['jobs'][f'{data_type}|{genre}']['next']
+        if next_url is None:
+            return None
+        page, base = urlsplit(next_url), urlsplit(search_url)
+        return urlunsplit((base.scheme, base.netloc, page.path, page.query, ''))
+    
+    # Keep only new or changed rows and add them to the in-memory dedup set, the first copy in a run wins.
+    # The dedup log on disk is appended by record_seen once the rows are written.
+    def new_rows(self, rows, data_type):
+        id_column = ID_COLUMNS[data_type]
+        seen = self.seen[data_type]
+        seen_this_run = self.seen_this_run[data_type]
+        changed = []
+        with self._lock:
+            for row in rows:
+                if row[id_column] in seen_this_run:
+                    continue
+                seen_this_run.add(row[id_column])
+                digest = row_hash(row)
+                if seen.get(row[id_column]) != digest:
+                    seen[row[id_column]] = digest
+                    changed.append(row)
+        return changed
+    
+    def record_seen(self, rows, data_type):
+        id_column = ID_COLUMNS[data_type]
+        if rows:
+            with self._lock, open(self._seen_file(data_type), 'a', encoding='utf-8') as f:
+                f.writelines(f'{row[id_column]}\t{self.seen[data_type][row[id_column]]}\n' for row in rows)
+    
+    # Record the next page of a search after its rows were written
+    def checkpoint(self, genre, data_type, next_url):
+        with self._lock:
+            job = self.checkpoints['jobs'][f'{data_type}|{genre}']
+            job['next'] = next_url
+            job['done'] = next_url is None
+            job['pages'] += 1
+            self._save_checkpoints()
+
+
+# Convert search result items to rows
+def parse_items(items, data_type, genre):
+    rows = []
+    for item in items:
+        if data_type == 'artist':
+            images = item.get('images', [])
+            artist_image_url = images[0].get('url') if images else None
+            
+            rows.append({
+                'Artist Name': item['name'],
+                'Artist ID': item['id'],
+                'Popularity': item.get('popularity', None),
+                'Followers': item.get('followers', {}).get('total', None),
+                'Genres': item.get('genres', []),
+                'Genre Queried': genre,  # Track the genre that was queried
+                'Artist Image': artist_image_url  # Get the first image URL or None
+            })
+        elif data_type == 'track':
+            album_images = item['album'].get('images', [])
+            track_image_url = album_images[0].get('url') if album_images else None
+            artist_ids = [artist.get('id') for artist in item.get('artists', [])]
+            
+            rows.append({
+                'Track Name': item['name'],
+                'Track ID': item['id'],
+                'Duration (ms)': item.get('duration_ms', None),
+                'Popularity': item.get('popularity', None),
+                'Track Number': item.get('track_number', None),
+                'URI': item.get('uri', None),
+                'Album Name': item['album']['name'],
+                'Album ID': item['album']['id'],
+                'Artists': [artist['name'] for artist in item.get('artists', [])],
+                'Artist IDs': artist_ids if all(artist_ids) else None,  # Joined by name downstream when missing
+                'Genre Queried': genre,  # Track the genre that was queried
+                'Track Image': track_image_url  # Get the first image URL from album or None
+            })
+    return rows
+
+
+#Function to fetch data by genre
+def fetch_data_by_genre(genre, client, data_type, on_page=None, search_url=SEARCH_URL, start_url=None):
+    """
+    Walks the search result pages for one genre and type.
+
+    Parameters:
+    - genre (str): Genre to search for.
+    - client (SpotifyClient): Shared client used for the requests.
+    - data_type (str): 'artist' or 'track'.
+    - on_page (function): Called with (rows, next page URL) as each page arrives (optional).
+    - search_url (str): Search endpoint (default is the Spotify Web API).
+    - start_url (str): Page to resume from instead of the first one (optional).
+
+    Returns:
+    - all_data (list): All rows, empty when on_page is given.
+    """
     all_data = []
-    search_url = f'{base_url}?q=genre:"{genre}"&type={data_type}&limit=50'
+    search_url = start_url or f'{search_url}?q=genre:"{genre}"&type={data_type}&limit=50'
     
     while search_url:
-        response = requests.get(search_url, headers=headers)
-        if response.status_code != 200:
-            print(f"Error: {response.status_code}, {response.text}")
-            break
-        
-        search_results = response.json()
+        search_results = client.get(search_url)
+        if search_results is None:
+            raise RuntimeError(f"Search failed for {data_type} genre {genre}: {search_url}")
         
         # Process results based on type
-        items = search_results.get(data_type + 's', {}).get('items', [])
-        
-        for item in items:
-            if data_type == 'artist':
-                images = item.get('images', [])
-                artist_image_url = images[0].get('url') if images else None
-                
-                all_data.append({
-                    'Artist Name': item['name'],
-                    'Artist ID': item['id'],
-                    'Popularity': item.get('popularity', None),
-                    'Followers': item.get('followers', {}).get('total', None),
-                    'Genres': ', '.join(item.get('genres', [])),
-                    'Genre Queried': genre,  # Track the genre that was queried
-                    'Artist Image': artist_image_url  # Get the first image URL or None
-                })
-            elif data_type == 'track':
-                album_images = item['album'].get('images', [])
-                track_image_url = album_images[0].get('url') if album_images else None
-                
-                all_data.append({
-                    'Track Name': item['name'],
-                    'Track ID': item['id'],
-                    'Duration (ms)': item.get('duration_ms', None),
-                    'Popularity': item.get('popularity', None),
-                    'Track Number': item.get('track_number', None),
-                    'URI': item.get('uri', None),
-                    'Album Name': item['album']['name'],
-                    'Album ID': item['album']['id'],
-                    'Artists': ', '.join(artist['name'] for artist in item.get('artists', [])),
-                    'Genre Queried': genre,  # Track the genre that was queried
-                    'Track Image': track_image_url  # Get the first image URL from album or None
-                })
+        rows = parse_items(search_results.get(data_type + 's', {}).get('items', []), data_type, genre)
         
         # Check if there's a next page (pagination) and get the next set of results
         search_url = search_results.get(data_type + 's', {}).get('next', None)
+        if on_page:
+            on_page(rows, search_url)
+        else:
+            all_data.extend(rows)
         print(f"Fetching next page of {data_type} for genre: {genre}") if search_url else None
     
     return all_data
 
 
+def crawl_genres(genres, client, crawl_dir=CRAWL_DIR, max_workers=MAX_WORKERS, search_url=SEARCH_URL, output_format=None):
+    """
+    Resumable, incremental crawl of artists and tracks for all genres, fetched concurrently.
+    Only new or changed rows (by Spotify ID) are appended to this run's partition files in crawl_dir;
+    a failed search keeps its checkpoint and continues from that page on the next call.
+    Checkpoints and dedup log entries are only recorded once their rows are written.
+
+    Parameters:
+    - genres (list): Genres to search for.
+    - client (SpotifyClient): Shared client used for the requests.
+    - crawl_dir (str): Directory for checkpoints, dedup logs and partitions (default is data/crawl).
+    - max_workers (int): Number of (genre, type) searches fetched at the same time.
+    - search_url (str): Search endpoint (default is the Spotify Web API).
+    - output_format (str): 'parquet' or 'csv' (default is Parquet when pyarrow is installed, otherwise CSV).
+
+    Returns:
+    - counts (dict): Number of new or changed rows written per type, and the searches left unfinished.
+    """
+    state = CrawlState(crawl_dir)
+    jobs = [(genre, data_type) for genre in genres for data_type in ID_COLUMNS]
+    state.start_run(jobs)
+    output_format = output_format or (OUTPUT_FORMAT if parquet_available() else 'csv')
+    if output_format == 'parquet':
+        streams = {data_type: ParquetStream(state.partition_file(data_type, 'parquet'), data_type) for data_type in ID_COLUMNS}
+    else:
+        streams = {
+            'artist': CsvStream(state.partition_file('artist'), ARTIST_COLUMNS),
+            'track': CsvStream(state.partition_file('track'), TRACK_COLUMNS),
+        }
+    
+    def on_page(genre, data_type):
+        def write_page(rows, next_url):
+            rows = state.new_rows(rows, data_type)
+            def written():
+                state.record_seen(rows, data_type)
+                state.checkpoint(genre, data_type, next_url)
+            streams[data_type].write_rows(rows, written)
+        return write_page
+    
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch_data_by_genre, genre, client, data_type, on_page(genre, data_type),
+                                search_url, state.start_url(genre, data_type, search_url)): (genre, data_type)
+                for genre, data_type in state.pending_jobs(jobs)
+            }
+            for future in as_completed(futures):
+                genre, data_type = futures[future]
+                try:
+                    future.result()
+                    print(f"Finished {data_type} data for genre: {genre}")
+                except Exception as e:
+                    failed.append((genre, data_type))
+                    print(f"Failed {data_type} data for genre: {genre} ({e}), will resume from checkpoint")
+    finally:
+        for stream in streams.values():
+            stream.close()
+    
+    for data_type, stream in streams.items():
+        if stream.rows:
+            print(f"Data saved to {stream.filename} ({stream.rows} new or changed {data_type} rows)")
+        else:
+            print(f"No new or changed {data_type} rows")
+    counts = {data_type: stream.rows for data_type, stream in streams.items()}
+    counts['unfinished'] = failed
+    return counts
+
+
 #Save the data as csv
 def save_to_csv(data, filename):
-    df = pd.DataFrame(data)
-    df.to_csv(filename, index=False)
+    open(filename, 'w').close()  # Replace an existing file
+    stream = CsvStream(filename, TRACK_COLUMNS if data and 'Track ID' in data[0] else ARTIST_COLUMNS)
+    stream.write_rows(data)
+    stream.close()
     print(f"Data saved to {filename}")
 
-# Get access token
-access_token = get_access_token(CLIENT_ID, CLIENT_SECRET)
 
 # List of genres
 GENRES = ['k-pop','k-pop boy group', 'k-pop girl group', '5th gen k-pop','classic k-pop','korean r&b',
@@ -118,23 +514,13 @@ GENRES = ['k-pop','k-pop boy group', 'k-pop girl group', '5th gen k-pop','classi
           'korean hyperpop', 'korean metal', 'korean electropop', 'korean indie folk', 'korean soundtrack', 
           'korean superband', 'korean jazz', 'korean hardcore', 'korean musicals', 'korean shoegaze', 'korean experimental']
 
-# Initialize lists to hold all artist and track data across genres
-all_artists_data = []
-all_tracks_data = []
 
+# Main function to fetch all genres and save them
+def main():
+    client = SpotifyClient(CLIENT_ID, CLIENT_SECRET)
+    crawl_genres(GENRES, client)
 
-# Fetch and accumulate data for each genre
-for genre in GENRES:
-    print(f"Fetching data for genre: {genre}")
-    
-    # Fetch data
-    artists_data = fetch_data_by_genre(genre, access_token, 'artist')
-    tracks_data = fetch_data_by_genre(genre, access_token, 'track')
-    
-    # Append to the master lists
-    all_artists_data.extend(artists_data)
-    all_tracks_data.extend(tracks_data)
 
-# Save merged data to CSV files
-save_to_csv(all_artists_data, 'all_artists_data.csv')
-save_to_csv(all_tracks_data, 'all_tracks_data.csv')
\ No newline at end of file
+# Run the script
+if __name__ == "__main__":
+    main()
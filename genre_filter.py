@@ -0,0 +1,101 @@
+#Python Script for the bitset genre filtering engine
+#Every row gets a uint64 bitmask over a genre vocabulary (bit i = genres_list[i]), with exact genre matching:
+#'k-pop' does not match 'k-pop ballad'. Queries compile to vectorized bitwise operations over the whole catalogue.
+
+#Import necessary libraries
+import numpy as np
+import pandas as pd
+from instrumentation import instrumented
+
+MAX_GENRES = 64
+
+
+# Genres of one value: a ', '-joined string (as written by data_retrieve) or a list
+def split_genres(value):
+    if isinstance(value, str):
+        return [genre for genre in value.split(', ') if genre]
+    if isinstance(value, (list, tuple, set, np.ndarray)):
+        return list(value)
+    return []
+
+
+@instrumented
+def encode_genres(genres, genres_list):
+    """
+    Encodes a Genres column as uint64 bitmasks, exact match against the vocabulary.
+
+    Parameters:
+    - genres (Series): Genres column, one genre or a ', '-joined list of genres per row.
+    - genres_list (list): Genre vocabulary (at most 64 genres), genres outside it are ignored.
+
+    Returns:
+    - masks (array): uint64 bitmask per row.
+    """
+    if len(genres_list) > MAX_GENRES:
+        raise ValueError(f"At most {MAX_GENRES} genres fit in a uint64 bitmask, got {len(genres_list)}")
+    bit_values = {genre: np.uint64(1 << bit) for bit, genre in enumerate(genres_list)}
+    
+    # Encode each distinct value once, rows share the result through their codes
+    try:
+        codes, uniques = pd.factorize(genres)
+    except TypeError:
+        # Unhashable list values, join them like data_retrieve does
+        codes, uniques = pd.factorize(pd.Series(genres).map(lambda value: ', '.join(split_genres(value))))
+    unique_masks = np.zeros(len(uniques) + 1, dtype=np.uint64)
+    for position, value in enumerate(uniques):
+        for genre in split_genres(value):
+            unique_masks[position] |= bit_values.get(genre, np.uint64(0))
+    return unique_masks[codes]  # code -1 (missing) picks the trailing 0
+
+
+# Bitmask for a list of genres, genres outside the vocabulary are ignored
+def genre_bits(genre_positions, genres):
+    mask = np.uint64(0)
+    for genre in genres or []:
+        if genre in genre_positions:
+            mask |= np.uint64(1 << genre_positions[genre])
+    return mask
+
+
+def compile_genre_query(genre_positions, any_of=None, all_of=None, none_of=None):
+    """
+    Compiles a genre query to bitmasks.
+
+    Parameters:
+    - genre_positions (dict): Genre -> bit, e.g. catalogue['genre_positions'].
+    - any_of (list): Match rows with at least one of these genres (optional).
+    - all_of (list): Match rows with every one of these genres (optional).
+    - none_of (list): Match rows with none of these genres (optional).
+
+    Returns:
+    - query (tuple): (any mask, all mask, none mask) for match_genres. An any_of list with no known genre matches nothing.
+    """
+    any_mask = genre_bits(genre_positions, any_of)
+    if any_of and any_mask == 0:
+        any_mask = None
+    all_mask = genre_bits(genre_positions, all_of)
+    if all_of and not set(all_of) <= genre_positions.keys():
+        all_mask = None
+    return any_mask, all_mask, genre_bits(genre_positions, none_of)
+
+
+def match_genres(masks, query):
+    """
+    Evaluates a compiled genre query over an array of bitmasks.
+
+    Parameters:
+    - masks (array): uint64 bitmask per row or track.
+    - query (tuple): Output of compile_genre_query.
+
+    Returns:
+    - matches (array): Boolean array, True where the row matches.
+    """
+    any_mask, all_mask, none_mask = query
+    if any_mask is None or all_mask is None:
+        return np.zeros(len(masks), dtype=bool)
+    matches = (masks & none_mask) == 0
+    if any_mask:
+        matches &= (masks & any_mask) != 0
+    if all_mask:
+        matches &= (masks & all_mask) == all_mask
+    return matches
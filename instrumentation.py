@@ -0,0 +1,225 @@
+#Python Script for stage-level instrumentation of the recommendation pipeline
+#Switched on with an environment variable before the modules are imported:
+#- KPOP_INSTRUMENTATION=1      Wall time of every instrumented stage, aggregated into histograms.
+#- KPOP_INSTRUMENTATION=alloc  Also the peak memory allocated inside each stage (tracemalloc, slower). tracemalloc's
+#                              peak is process-wide, so measured stages run one thread at a time in this mode.
+#- KPOP_INSTRUMENTATION_FILE   Path of a JSON (or .prom Prometheus text) snapshot written at exit (optional).
+#When switched off, @instrumented returns the function unchanged and stage() is a shared no-op context.
+
+#Import necessary libraries
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+import tracemalloc
+from contextlib import nullcontext
+from functools import wraps
+
+MODE = os.environ.get('KPOP_INSTRUMENTATION', '').strip().lower()
+ENABLED = MODE not in ('', '0', 'false', 'off')
+TRACK_ALLOCATIONS = MODE == 'alloc'
+
+# Histogram bucket upper bounds: latency in milliseconds, allocations in kilobytes
+LATENCY_BUCKETS_MS = [0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+ALLOCATION_BUCKETS_KB = [16, 64, 256, 1024, 4096, 16384, 65536, 262144, 1048576]
+
+
+# Fixed-bucket histogram (cumulative counts on export, like Prometheus)
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, milliseconds):
+        self.counts[bisect.bisect_left(self.buckets, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+    # Upper bound of the bucket holding the given quantile
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + [float('inf')], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def cumulative(self):
+        counts, seen = [], 0
+        for count in self.counts:
+            seen += count
+            counts.append(seen)
+        return counts
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_ms': round(self.total, 3),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets_ms': {str(bound): count for bound, count in zip(self.buckets + ['+Inf'], self.cumulative())},
+        }
+
+    # Prometheus text exposition lines of the histogram
+    def prometheus(self, name, labels=''):
+        separator = ',' if labels else ''
+        lines = [f'{name}_bucket{{{labels}{separator}le="{bound}"}} {count}'
+                 for bound, count in zip(self.buckets + ['+Inf'], self.cumulative())]
+        lines.append(f'{name}_sum{{{labels}}} {self.total}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+# Per-stage latency and allocation histograms
+class StageRegistry:
+    def __init__(self):
+        self.latency = {}
+        self.allocations = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Held from a thread's outermost measured stage to its end: reset_peak() and the peak are process-wide,
+        # so overlapping stages in other threads would reset each other's peak and count each other's allocations.
+        # Allocations of threads outside any stage (e.g. the api_server event loop) still count.
+        self._allocation_lock = threading.RLock()
+
+    def observe(self, name, milliseconds, allocated_bytes=None):
+        with self._lock:
+            self.latency.setdefault(name, LatencyHistogram()).observe(milliseconds)
+            if allocated_bytes is not None:
+                self.allocations.setdefault(name, LatencyHistogram(ALLOCATION_BUCKETS_KB)).observe(allocated_bytes / 1024)
+
+    # Nested stages: an inner stage resets the tracemalloc peak, so the outer one keeps the peak seen so far
+    def _allocation_frames(self):
+        if not hasattr(self._local, 'frames'):
+            self._local.frames = []
+        return self._local.frames
+
+    def enter(self):
+        self._allocation_lock.acquire()
+        frames = self._allocation_frames()
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        frames.append([current, current])
+
+    def exit(self):
+        frames = self._allocation_frames()
+        _, peak = tracemalloc.get_traced_memory()
+        start, seen = frames.pop()
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        self._allocation_lock.release()
+        return max(seen, peak) - start
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'stages': {name: histogram.snapshot() for name, histogram in sorted(self.latency.items())},
+                'allocations_kb': {name: {key.replace('_ms', '_kb'): value for key, value in histogram.snapshot().items()}
+                                   for name, histogram in sorted(self.allocations.items())},
+            }
+
+    def prometheus_text(self):
+        with self._lock:
+            lines = ['# TYPE kpop_stage_duration_ms histogram']
+            for name, histogram in sorted(self.latency.items()):
+                lines.extend(histogram.prometheus('kpop_stage_duration_ms', f'stage="{name}"'))
+            if self.allocations:
+                lines.append('# TYPE kpop_stage_allocated_kb histogram')
+                for name, histogram in sorted(self.allocations.items()):
+                    lines.extend(histogram.prometheus('kpop_stage_allocated_kb', f'stage="{name}"'))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self.latency.clear()
+            self.allocations.clear()
+
+
+registry = StageRegistry()
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if TRACK_ALLOCATIONS:
+            registry.enter()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = (time.perf_counter() - self.start) * 1000
+        registry.observe(self.name, elapsed, registry.exit() if TRACK_ALLOCATIONS else None)
+        return False
+
+
+_DISABLED_STAGE = nullcontext()
+
+
+def stage(name):
+    """
+    Times a block of code as a named stage: `with stage('app.render'): ...`
+
+    Parameters:
+    - name (str): Stage name in the snapshot.
+
+    Returns:
+    - context manager: A shared no-op context when instrumentation is switched off.
+    """
+    return _Stage(name) if ENABLED else _DISABLED_STAGE
+
+
+def instrumented(func=None, name=None):
+    """
+    Decorator timing every call of a function as a stage (default name: module.function).
+    When instrumentation is switched off the function is returned unchanged.
+    """
+    if func is None:
+        return lambda func: instrumented(func, name)
+    if not ENABLED:
+        return func
+    stage_name = name or f'{func.__module__}.{func.__qualname__}'
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _Stage(stage_name):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def prometheus_text():
+    return registry.prometheus_text()
+
+
+def write_snapshot(path):
+    """
+    Writes the current snapshot, as Prometheus text when the path ends with .prom, otherwise as JSON.
+    """
+    with open(path, 'w') as f:
+        if path.endswith('.prom'):
+            f.write(prometheus_text())
+        else:
+            json.dump(snapshot(), f, indent=2)
+
+
+if ENABLED:
+    if TRACK_ALLOCATIONS and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if os.environ.get('KPOP_INSTRUMENTATION_FILE'):
+        atexit.register(write_snapshot, os.environ['KPOP_INSTRUMENTATION_FILE'])
@@ -0,0 +1,101 @@
+#Python Script for a local mock of the Spotify Web API, used to test data_retrieve offline
+#Replays recorded search responses (a JSON file of {"/v1/search?...": response}, e.g. SpotifyClient(recordings={}) dumped with json.dump)
+#Usage: python mock_spotify_server.py recordings.json --port 8765 --rate-limit-every 10 --expire-token-every 25
+
+#Import necessary libraries
+import json
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+
+SPOTIFY_API = 'https://api.spotify.com'
+
+
+# Request handler, state lives on the server object
+class MockSpotifyHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path != '/api/token':
+            return self._send_json(404, {'error': 'not found'})
+        with self.server.lock:
+            self.server.token_count += 1
+            token = f'mock-token-{self.server.token_count}'
+            self.server.valid_token = token
+        self._send_json(200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': 3600})
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            count = server.request_count
+            if server.expire_token_every and count % server.expire_token_every == 0:
+                server.valid_token = None
+            valid_token = server.valid_token
+        
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            return self._send_json(429, {'error': 'rate limited'}, {'Retry-After': str(server.retry_after)})
+        if self.headers.get('Authorization') != f'Bearer {valid_token}':
+            return self._send_json(401, {'error': 'The access token expired'})
+        
+        response = server.recordings.get(unquote(self.path))
+        if response is None:
+            return self._send_json(404, {'error': f'no recording for {unquote(self.path)}'})
+        # Point pagination links back at this server
+        self._send_json(200, json.loads(json.dumps(response).replace(SPOTIFY_API, server.base_url)))
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(recordings, port=0, rate_limit_every=0, expire_token_every=0, retry_after=1):
+    """
+    Starts the mock server in a background thread.
+
+    Parameters:
+    - recordings (dict): Request path and query -> recorded JSON response.
+    - port (int): Port to listen on (default 0 picks a free port).
+    - rate_limit_every (int): Answer every n-th search with 429 and Retry-After (0 disables).
+    - expire_token_every (int): Invalidate the current token every n-th search (0 disables).
+    - retry_after (int): Retry-After seconds sent with 429 responses.
+
+    Returns:
+    - server (ThreadingHTTPServer): Running server, base_url points at it. Call shutdown() to stop.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockSpotifyHandler)
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    server.recordings = recordings
+    server.rate_limit_every = rate_limit_every
+    server.expire_token_every = expire_token_every
+    server.retry_after = retry_after
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.token_count = 0
+    server.valid_token = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Run the script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay recorded Spotify search responses.')
+    parser.add_argument('recordings')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate-limit-every', type=int, default=0)
+    parser.add_argument('--expire-token-every', type=int, default=0)
+    args = parser.parse_args()
+    
+    with open(args.recordings) as f:
+        server = start_mock_server(json.load(f), args.port, args.rate_limit_every, args.expire_token_every)
+    print(f"Mock Spotify API on {server.base_url} (token: {server.base_url}/api/token, search: {server.base_url}/v1/search)")
+    threading.Event().wait()
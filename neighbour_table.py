@@ -0,0 +1,97 @@
+#Python Script for the precomputed related-tracks neighbour tables
+#related_tracks.py writes one table per genre weight setting under data/cache/related_tracks/<weights key>/.
+#Online, the neighbours of seed tracks are one slice of the memory-mapped table; requests the tables
+#cannot answer exactly (unseen weights, top_n too large, stale catalogue) return None for live computation.
+
+#Import necessary libraries
+import os
+import json
+import hashlib
+import numpy as np
+
+RELATED_DIR = 'data/cache/related_tracks'
+
+
+def weights_key(weights, genres):
+    """
+    Name of the table for a genre weight setting. Weights of 1 are the default and do not change the key.
+
+    Parameters:
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - genres (list): Genres of the index, weights for other genres are ignored like in the live path.
+
+    Returns:
+    - key (str): 'default' for unweighted similarity, otherwise a short hash of the effective weights.
+    """
+    effective = {genre: float(weights[genre]) for genre in genres if weights and genre in weights and float(weights[genre]) != 1.0}
+    if not effective:
+        return 'default'
+    return hashlib.sha1(json.dumps(effective, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+# Identifies the genre matrix a table was computed from
+def index_fingerprint(index):
+    counts = index['counts']
+    digest = hashlib.sha1(repr((counts.shape, list(index['genres']))).encode('utf-8'))
+    for array in (counts.indptr, counts.indices, counts.data):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def open_neighbour_tables(index, root=RELATED_DIR):
+    """
+    Opens every precomputed table that matches the index as memory-mapped arrays.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - root (str): Directory holding one sub-directory per weights key (default is data/cache/related_tracks).
+
+    Returns:
+    - tables (dict): weights key -> {'neighbours', 'scores', 'top_k', ...}, empty when nothing was precomputed.
+    """
+    tables = {}
+    if not os.path.isdir(root):
+        return tables
+
+    fingerprint = index_fingerprint(index)
+    for key in sorted(os.listdir(root)):
+        meta_file = os.path.join(root, key, 'meta.json')
+        if not os.path.exists(meta_file):
+            continue
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta.get('fingerprint') != fingerprint:
+            continue
+        meta['neighbours'] = np.load(os.path.join(root, key, 'neighbours.npy'), mmap_mode='r')
+        meta['scores'] = np.load(os.path.join(root, key, 'scores.npy'), mmap_mode='r')
+        tables[meta['weights_key']] = meta
+    return tables
+
+
+def lookup_neighbours(tables, index, seeds, top_n=10, weights=None):
+    """
+    Neighbours of the seed tracks from a precomputed table, same result as similar_tracks.
+
+    Parameters:
+    - tables (dict): Tables from open_neighbour_tables.
+    - index (dict): Index returned by build_track_index.
+    - seeds (array): Dense track IDs of one request.
+    - top_n (int): Number of neighbours per seed track (default is 10).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+
+    Returns:
+    - neighbours (array): Dense track IDs, one row per seed, most similar first, or None when the
+      table for these weights is missing or too short to answer exactly.
+    """
+    table = tables.get(weights_key(weights, index['genres']))
+    if table is None or top_n > table['top_k']:
+        return None
+
+    # One slice of the table, then the request's other seeds are skipped
+    seeds = np.asarray(seeds, dtype=np.intp)
+    rows = np.asarray(table['neighbours'][seeds], dtype=np.intp)
+    is_seed = np.isin(rows, seeds)
+    if len(seeds) and (~is_seed).sum(axis=1).min() < top_n:
+        return None
+    keep = np.argsort(is_seed, axis=1, kind='stable')[:, :top_n]
+    return np.take_along_axis(rows, keep, axis=1)
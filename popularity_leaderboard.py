@@ -0,0 +1,187 @@
+#Python Script for materialized per-genre popularity leaderboards
+#Built once from clean_and_prepare_data output and updated incrementally with newly retrieved rows:
+#CrawlRefresher merges the track partitions an incremental crawl (data_retrieve.crawl_genres) wrote since its last refresh.
+
+#Import necessary libraries
+import os
+import threading
+import numpy as np
+import pandas as pd
+from genre_filter import encode_genres
+from data_processing import read_table, crawl_partition_files, clean_and_prepare_data
+from instrumentation import instrumented
+
+CRAWL_DIR = 'data/crawl'
+
+# Columns kept for each leaderboard: (columns, key, sort column)
+TRACK_COLUMNS = ['Track Name', 'Track ID', 'Artist Name', 'Album Name', 'Track Image', 'Track Popularity']
+ARTIST_COLUMNS = ['Artist Name', 'Artist ID', 'Followers', 'Artist Image']
+BOARDS = {
+    'top_tracks': (TRACK_COLUMNS, 'Track ID', 'Track Popularity'),
+    'top_artists': (ARTIST_COLUMNS, 'Artist ID', 'Followers'),
+}
+
+
+# Rows matching each genre exactly, one bitmask pass over the frame (see genre_filter.py)
+def _genre_rows(df, genres_list):
+    masks = encode_genres(df['Genres'], genres_list)
+    for bit, genre in enumerate(genres_list):
+        yield genre, df[(masks & np.uint64(1 << bit)) != 0]
+
+
+# Sort descending, stable so ties keep their row order
+def _sorted_board(rows, key, column):
+    rows = rows.drop_duplicates(subset=key, keep='first')
+    return rows.iloc[np.argsort(-rows[column].to_numpy(dtype=float), kind='stable')]
+
+
+# Merge new rows into an already sorted board without re-sorting it
+def _merge_sorted(board, new_rows, key, column):
+    # The latest retrieved row for an ID replaces the one on the board
+    new_rows = _sorted_board(new_rows.drop_duplicates(subset=key, keep='last'), key, column)
+    board = board[~board[key].isin(new_rows[key])]
+    
+    # Insert after equal scores so ties keep arrival order
+    positions = np.searchsorted(-board[column].to_numpy(dtype=float), -new_rows[column].to_numpy(dtype=float), side='right')
+    new_at = positions + np.arange(len(new_rows))
+    
+    total = len(board) + len(new_rows)
+    take = np.empty(total, dtype=np.intp)
+    is_new = np.zeros(total, dtype=bool)
+    is_new[new_at] = True
+    take[new_at] = len(board) + np.arange(len(new_rows))
+    take[~is_new] = np.arange(len(board))
+    return pd.concat([board, new_rows]).iloc[take]
+
+
+@instrumented
+def build_leaderboards(df, genres_list):
+    """
+    Precomputes the per-genre top tracks and top artists, sorted by popularity.
+
+    Parameters:
+    - df (DataFrame): Output of clean_and_prepare_data.
+    - genres_list (list): Genres to build leaderboards for.
+
+    Returns:
+    - leaderboards (dict): Genre -> {'top_tracks': DataFrame, 'top_artists': DataFrame}, best first.
+    """
+    leaderboards = {}
+    for genre, genre_df in _genre_rows(df, genres_list):
+        if genre_df.empty:
+            continue
+        leaderboards[genre] = {
+            name: _sorted_board(genre_df[columns], key, column)
+            for name, (columns, key, column) in BOARDS.items()
+        }
+    return leaderboards
+
+
+def update_leaderboards(leaderboards, new_rows, genres_list, updated_ids=None):
+    """
+    Merges newly retrieved rows into the leaderboards in place, without rebuilding them.
+
+    Parameters:
+    - leaderboards (dict): Leaderboards from build_leaderboards.
+    - new_rows (DataFrame): New rows from data_retrieve, prepared with clean_and_prepare_data.
+      Every prepared row of a track or artist must be included, an ID missing from a genre's rows leaves its board.
+    - genres_list (list): Genres to update.
+    - updated_ids (dict): Key column ('Track ID', 'Artist ID') -> IDs the new rows replace, including those
+      left without any row (e.g. a track whose artists lost every kept genre). Default is the IDs in new_rows.
+
+    Returns:
+    - leaderboards (dict): The updated leaderboards.
+    """
+    updated_ids = updated_ids or {}
+    new_ids = {key: pd.Index(new_rows[key]).union(pd.Index(updated_ids.get(key, []))).unique() for _, key, _ in BOARDS.values()}
+    for genre, genre_df in _genre_rows(new_rows, genres_list):
+        if genre not in leaderboards:
+            if not genre_df.empty:
+                leaderboards[genre] = {
+                    name: _sorted_board(genre_df[columns], key, column)
+                    for name, (columns, key, column) in BOARDS.items()
+                }
+            continue
+        for name, (columns, key, column) in BOARDS.items():
+            # IDs whose genres changed and no longer include this one come off its board
+            board = leaderboards[genre][name]
+            board = board[~board[key].isin(new_ids[key].difference(genre_df[key]))]
+            if not genre_df.empty:
+                board = _merge_sorted(board, genre_df[columns], key, column)
+            leaderboards[genre][name] = board
+    return leaderboards
+
+
+class CrawlRefresher:
+    """
+    Keeps leaderboards up to date with an incremental crawl, merging only the track partitions
+    written (or appended to) since the last refresh. Safe to call from several threads.
+    Crawled tracks are joined with the catalogue's artists and every crawled artist (latest row per ID),
+    so a crawled artist's new genres or followers reach the boards through its crawled tracks.
+
+    Parameters:
+    - leaderboards (dict): Leaderboards from build_leaderboards, updated in place.
+    - artists_file (str): Artists file the catalogue was built from.
+    - genres_list (list): Genres of the leaderboards.
+    - crawl_dir (str): Directory of the crawl partitions (default is data/crawl).
+    """
+    def __init__(self, leaderboards, artists_file, genres_list, crawl_dir=CRAWL_DIR):
+        self.leaderboards = leaderboards
+        self.artists_file = artists_file
+        self.genres_list = list(genres_list)
+        self.crawl_dir = crawl_dir
+        self.applied = {}  # Track partition -> (size, mtime) when it was merged
+        self._lock = threading.Lock()
+
+    def _stamp(self, path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @instrumented
+    def refresh(self):
+        """
+        Merges the new or grown track partitions into the leaderboards.
+
+        Returns:
+        - rows (int): Number of crawled track rows merged, 0 when nothing changed.
+        """
+        with self._lock:
+            changed = {path: self._stamp(path) for path in crawl_partition_files(self.crawl_dir, 'track')}
+            changed = {path: stamp for path, stamp in changed.items() if self.applied.get(path) != stamp}
+            if not changed:
+                return 0
+
+            # A grown CSV partition is merged again as a whole, the latest row for an ID replaces the one on a board
+            tracks = pd.concat([read_table(path) for path in changed], ignore_index=True)
+            tracks = tracks.drop_duplicates(subset='Track ID', keep='last')
+            artists = [read_table(self.artists_file)] + [read_table(path) for path in crawl_partition_files(self.crawl_dir, 'artist')]
+            artists = pd.concat(artists, ignore_index=True).drop_duplicates(subset='Artist ID', keep='last')
+
+            prepared = clean_and_prepare_data(artists, tracks, self.genres_list)
+            update_leaderboards(self.leaderboards, prepared, self.genres_list, {'Track ID': tracks['Track ID']})
+            self.applied.update(changed)
+            return len(tracks)
+
+
+@instrumented
+def top_from_leaderboards(leaderboards, genres_list, top_n=5):
+    """
+    Answers a popularity query from the leaderboards with one slice per genre.
+
+    Parameters:
+    - leaderboards (dict): Leaderboards from build_leaderboards.
+    - genres_list (list): Genres to get recommendations for.
+    - top_n (int): Number of tracks and artists per genre (default is 5).
+
+    Returns:
+    - recommendations (dict): Same structure as popularity_based_recommendation_system.
+    """
+    recommendations = {}
+    for genre in genres_list:
+        if genre not in leaderboards:
+            print(f"No data available for genre: {genre}")
+            continue
+        recommendations[genre] = {
+            name: board.iloc[:top_n] for name, board in leaderboards[genre].items()
+        }
+    return recommendations
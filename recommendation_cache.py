@@ -0,0 +1,81 @@
+#Python Script for the recommendation result cache
+#A bounded LRU with TTL shared by all sessions of the app, keyed by the recommendation inputs.
+
+#Import necessary libraries
+import time
+import threading
+from collections import OrderedDict
+
+
+# Hashable cache key for a recommendation request
+def make_key(mode, selected_tracks=None, preferred_genres=None, top_n=10, weights=None):
+    return (
+        mode,
+        tuple(selected_tracks or ()),
+        tuple(preferred_genres or ()),
+        top_n,
+        tuple(sorted(weights.items())) if weights else None,
+    )
+
+
+class RecommendationCache:
+    """
+    Thread-safe LRU cache with a time-to-live, for memoising recommendation results.
+    Cached results are shared between callers and must be treated as read-only.
+
+    Parameters:
+    - maxsize (int): Maximum number of cached results, the least recently used is evicted first.
+    - ttl (float): Seconds a result stays valid.
+    - clock (function): Time source (default is time.monotonic).
+    """
+    def __init__(self, maxsize=256, ttl=600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get_or_compute(self, key, compute):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+        
+        # Compute outside the lock so other keys are not blocked
+        value = compute()
+        
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+            }
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
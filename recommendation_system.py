@@ -2,32 +2,92 @@
 
 
 #Import necessary libraries
-import pandas as pd
 import numpy as np
-from IPython.display import display
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score
+from scipy.sparse import csr_matrix, diags
+from popularity_leaderboard import top_from_leaderboards, TRACK_COLUMNS, ARTIST_COLUMNS
+from catalogue import build_catalogue, genre_matrix, tracks_for_names
+from genre_filter import compile_genre_query, match_genres, genre_bits
+from ann_index import ann_search, N_PROBES
+from neighbour_table import lookup_neighbours
+from instrumentation import instrumented
+
+#Top-K Selection shared by the recommenders
+@instrumented
+def top_k_indices(scores, k, exclude=None):
+    """
+    Selects the k highest scores of every row with np.argpartition instead of a full sort.
+    Ties are broken by position (lower index first), the same order a stable descending sort gives.
+
+    Parameters:
+    - scores (array): 1-D scores or 2-D batch of scores (one row per query).
+    - k (int): Number of indices to return per row.
+    - exclude (array): One column index per row to leave out, e.g. the seed track itself (optional).
+
+    Returns:
+    - indices (array): Indices of the top scores, best first, shaped like scores with k columns.
+    """
+    scores = np.asarray(scores, dtype=float)
+    single = scores.ndim == 1
+    scores = np.atleast_2d(scores).copy()
+    scores[np.isnan(scores)] = -np.inf
+    if exclude is not None:
+        scores[np.arange(len(scores)), np.asarray(exclude)] = -np.inf
+    n_rows, n_cols = scores.shape
+    k = min(k, n_cols - (exclude is not None))
+    if k <= 0:
+        indices = np.empty((n_rows, 0), dtype=np.intp)
+        return indices[0] if single else indices
+    
+    # k-th largest value per row, everything above it is in, ties at it are filled in index order
+    kth = np.partition(scores, n_cols - k, axis=1)[:, n_cols - k]
+    above = scores > kth[:, None]
+    tied = scores == kth[:, None]
+    needed = k - above.sum(axis=1)
+    selected = above | (tied & (np.cumsum(tied, axis=1) <= needed[:, None]))
+    indices = np.nonzero(selected)[1].reshape(n_rows, k)
+    
+    # Order the k winners, stable so equal scores stay in index order
+    order = np.argsort(-np.take_along_axis(scores, indices, axis=1), axis=1, kind='stable')
+    indices = np.take_along_axis(indices, order, axis=1)
+    return indices[0] if single else indices
+
+
+# First df row for each distinct key (track or artist) among the given rows, in row order
+def _first_rows(rows, keys):
+    _, first = np.unique(keys[rows], return_index=True)
+    return rows[np.sort(first)]
+
 
 #Popularity Based Recommendations 
-def popularity_based_recommendation_system(df, genres_list, top_n=5):
+@instrumented
+def popularity_based_recommendation_system(df, genres_list, top_n=5, leaderboards=None, catalogue=None):
+    # Answer from the precomputed leaderboards when available (see popularity_leaderboard.py)
+    if leaderboards is not None:
+        return top_from_leaderboards(leaderboards, genres_list, top_n)
+    
+    # Genre membership and track/artist identity come from the catalogue model (see catalogue.py)
+    if catalogue is None:
+        catalogue = build_catalogue(df, genres_list)
+    track_popularity = df['Track Popularity'].to_numpy(dtype=float)
+    followers = df['Followers'].to_numpy(dtype=float)
+    
     recommendations = {}
     
     for genre in genres_list:
-        genre_df = df[df['Genres'].apply(lambda x: genre in x)]
+        genre_query = compile_genre_query(catalogue['genre_positions'], any_of=[genre])
+        genre_rows = np.flatnonzero(match_genres(catalogue['row_genres'], genre_query))
         
-        if genre_df.empty:
+        if len(genre_rows) == 0:
             print(f"No data available for genre: {genre}")
             continue
         
         # Top tracks with artist and album details
-        top_tracks = genre_df[['Track Name', 'Track ID', 'Artist Name', 'Album Name', 'Track Image', 'Track Popularity']].drop_duplicates().sort_values(by='Track Popularity', ascending=False).head(top_n)
+        track_rows = _first_rows(genre_rows, catalogue['row_track'])
+        top_tracks = df.iloc[track_rows[top_k_indices(track_popularity[track_rows], top_n)]][TRACK_COLUMNS]
         
         # Top artists
-        top_artists = genre_df[['Artist Name', 'Artist ID', 'Followers', 'Artist Image']].drop_duplicates().sort_values(by='Followers', ascending=False).head(top_n)
+        artist_rows = _first_rows(genre_rows, catalogue['row_artist'])
+        top_artists = df.iloc[artist_rows[top_k_indices(followers[artist_rows], top_n)]][ARTIST_COLUMNS]
         
         recommendations[genre] = {
             'top_tracks': top_tracks,
@@ -37,44 +97,139 @@ def popularity_based_recommendation_system(df, genres_list, top_n=5):
     return recommendations
 
 
-#Content Based Recommendation
-def kpop_content_based_recommendation_system(df, genres_list, user_interactions, preferred_genres=None, top_n=10, weights=None):
+# L2-normalised rows of a sparse matrix (all-zero rows stay zero), same as sklearn's normalize without importing sklearn
+def _normalize_rows(matrix):
+    matrix = csr_matrix(matrix, dtype=float, copy=True)
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    norms = np.sqrt(np.bincount(rows, weights=matrix.data ** 2, minlength=matrix.shape[0]))
+    matrix.data /= np.where(norms > 0, norms, 1.0)[rows]
+    return matrix
+
+
+# Min-max scaling to [0, 1], missing values score 0
+def _min_max(values):
+    values = np.where(np.isfinite(values), values, np.nan)
+    if np.isnan(values).all():
+        return np.zeros(len(values))
+    low, high = np.nanmin(values), np.nanmax(values)
+    scaled = (values - low) / (high - low) if high > low else np.ones(len(values))
+    return np.nan_to_num(scaled)
+
+
+# Popularity per dense track ID in [0, 1]: mean of scaled Track Popularity and log-scaled artist Followers
+def popularity_scores(catalogue):
+    followers = np.log1p(np.maximum(catalogue['track_followers'], 0))
+    return 0.5 * _min_max(catalogue['track_popularity']) + 0.5 * _min_max(np.where(np.isfinite(catalogue['track_followers']), followers, np.nan))
+
+
+#Track Feature Index for Content Based Recommendation
+@instrumented
+def build_track_index(catalogue):
     """
-    Creates a content-based recommendation system for K-pop music based on genre similarity.
+    Builds the sparse genre feature index used by the content-based recommender.
+    Build it once at startup and pass it to kpop_content_based_recommendation_system.
 
     Parameters:
-    - df (DataFrame): The dataset containing K-pop songs.
-    - genres_list (list): List of genres to be used for encoding.
-    - user_interactions (list): List of tracks the user has interacted with.
-    - preferred_genres (list): List of genres the user prefers (optional).
-    - top_n (int): Number of recommendations to return (default is 10).
+    - catalogue (dict): Catalogue model from build_catalogue.
+
+    Returns:
+    - index (dict): The catalogue, the genre list, the genre matrix per dense track ID (CSR),
+      its L2-normalised rows (CSR) and the popularity score of each track (see popularity_scores).
+    """
+    counts = csr_matrix(genre_matrix(catalogue))
+    
+    return {
+        'catalogue': catalogue,
+        'genres': catalogue['genres'],
+        'counts': counts,
+        'features': _normalize_rows(counts),
+        'popularity': popularity_scores(catalogue),
+    }
+
+
+def _weighted_features(index, weights=None):
+    # Re-weight genre columns and re-normalise rows, same as scaling the pivot columns before cosine similarity
+    if not weights:
+        return index['features']
+    column_weights = np.array([weights.get(genre, 1.0) for genre in index['genres']], dtype=float)
+    return _normalize_rows(index['counts'] @ diags(column_weights))
+
+
+@instrumented
+def similar_tracks_batch(index, seed_lists, top_n=10, weights=None, ann=None, n_probes=N_PROBES, related=None):
+    """
+    Finds the most similar tracks for the seed tracks of several requests in one scoring pass.
+    Only the seed rows are scored (k x N), the full N x N similarity matrix is never built.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - seed_lists (list): One array of dense track IDs per request.
+    - top_n (int): Number of neighbours per seed track (default is 10).
     - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - ann (dict): LSH index from ann_index.build_ann_index, scores only the seeds' buckets (optional).
+      Built on the unweighted features, so it is skipped when weights are given.
+    - n_probes (int): Extra buckets probed per LSH table (default is 2).
+    - related (dict): Precomputed tables from neighbour_table.open_neighbour_tables (optional).
+      Requests they cannot answer exactly (e.g. unseen weights) are computed live.
 
     Returns:
-    - recommendations_df (DataFrame): DataFrame of recommended tracks.
+    - neighbours (list): Per request, dense track IDs with one row per seed track, most similar first.
+      A request's own seeds are never its neighbours. ANN rows are padded with -1 when short of candidates.
     """
-    # Step 1: Binary Encoding of Genres
-    for genre in genres_list:
-        df[genre] = df['Genres'].apply(lambda x: 1 if genre in x else 0)
+    seed_lists = [np.asarray(seeds, dtype=np.intp) for seeds in seed_lists]
+    all_seeds = np.concatenate(seed_lists) if seed_lists else np.empty(0, dtype=np.intp)
+    if len(all_seeds) == 0:
+        return [np.empty((0, 0), dtype=np.intp) for _ in seed_lists]
     
-    # Step 2: Genre Pivot Table and Optional Weighted Cosine Similarity
-    genre_pivot = df.pivot_table(index='Track Name', columns=genres_list, aggfunc='sum', fill_value=0)
+    if related:
+        neighbours = [lookup_neighbours(related, index, seeds, top_n, weights) for seeds in seed_lists]
+        missing = [i for i, rows in enumerate(neighbours) if rows is None]
+        if missing:
+            live = similar_tracks_batch(index, [seed_lists[i] for i in missing], top_n, weights, ann, n_probes)
+            for i, rows in zip(missing, live):
+                neighbours[i] = rows
+        return neighbours
     
-    if weights:
-        for genre, weight in weights.items():
-            if genre in genre_pivot.columns:
-                genre_pivot[genre] = genre_pivot[genre] * weight
+    if ann is not None and not weights:
+        return [ann_search(ann, seeds, top_n, n_probes, exclude=[seeds] * len(seeds)) for seeds in seed_lists]
     
-    similarity_matrix = cosine_similarity(genre_pivot)
-    similarity_df = pd.DataFrame(similarity_matrix, index=genre_pivot.index, columns=genre_pivot.index)
+    features = _weighted_features(index, weights)
+    scores = (features[all_seeds] @ features.T).toarray()
     
-    # Step 3: Generate Content-Based Recommendations
-    recommendations = []
-    valid_tracks = [track for track in user_interactions if track in similarity_df.index]
+    # Seeds are never their own (or each other's) neighbours within a request
+    bounds = np.cumsum([0] + [len(seeds) for seeds in seed_lists])
+    for start, stop, seeds in zip(bounds[:-1], bounds[1:], seed_lists):
+        scores[np.ix_(np.arange(start, stop), seeds)] = -np.inf
+    n_candidates = scores.shape[1] - max((len(np.unique(seeds)) for seeds in seed_lists), default=0)
     
-    for track in valid_tracks:
-        similar_tracks = similarity_df[track].sort_values(ascending=False).head(top_n + 1)  # +1 to skip the track itself
-        recommendations.extend(similar_tracks.index[1:])  # Exclude the track itself
+    # One top-k pass over all seeds, ties stay in track ID order
+    top = top_k_indices(scores, min(top_n, n_candidates))
+    return [top[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def similar_tracks(index, seed_tracks, top_n=10, weights=None, ann=None, related=None):
+    """
+    Finds the most similar tracks for each seed track, see similar_tracks_batch.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - seed_tracks (array): Dense track IDs to find neighbours for.
+    - top_n (int): Number of neighbours per seed track (default is 10).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - ann (dict): LSH index for approximate search (optional).
+    - related (dict): Precomputed neighbour tables (optional).
+
+    Returns:
+    - neighbours (array): Dense track IDs, one row per seed track, most similar first (other seeds excluded).
+    """
+    return similar_tracks_batch(index, [seed_tracks], top_n, weights, ann, related=related)[0]
+
+
+# Steps 4 and 5 of the content-based recommender: preferred genre filter, dedup and truncate
+@instrumented
+def rank_content_recommendations(catalogue, neighbours, preferred_genres=None, top_n=10):
+    recommendations = np.asarray(neighbours).ravel()
+    recommendations = recommendations[recommendations >= 0]
     
     # Step 4: Filter Recommendations by User's Preferred Genres
     if preferred_genres:
@@ -82,63 +237,178 @@ def kpop_content_based_recommendation_system(df, genres_list, user_interactions,
         if 'k-pop' not in preferred_genres:
             preferred_genres = [genre for genre in preferred_genres if genre != 'k-pop']
         
-        recommendations = [
-            track for track in recommendations 
-            if any(genre in df.loc[df['Track Name'] == track, 'Genres'].values[0] for genre in preferred_genres)
-        ]
+        genre_query = compile_genre_query(catalogue['genre_positions'], any_of=preferred_genres)
+        recommendations = recommendations[match_genres(catalogue['track_genres'][recommendations], genre_query)]
+    
+    # Step 5: Keep the first occurrence of each track
+    _, first = np.unique(recommendations, return_index=True)
+    return recommendations[np.sort(first)][:top_n]
+
+
+#Content Based Recommendation
+@instrumented
+def kpop_content_based_recommendation_system(df, genres_list, user_interactions, preferred_genres=None, top_n=10, weights=None, index=None, ann=None, related=None):
+    """
+    Creates a content-based recommendation system for K-pop music based on genre similarity.
+
+    Parameters:
+    - df (DataFrame): The dataset containing K-pop songs (the one the index was built from).
+    - genres_list (list): List of genres to be used for encoding.
+    - user_interactions (list): List of tracks (names) the user has interacted with.
+    - preferred_genres (list): List of genres the user prefers (optional).
+    - top_n (int): Number of recommendations to return (default is 10).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - index (dict): Precomputed index from build_track_index (optional, built from df if missing).
+    - ann (dict): LSH index from ann_index.build_ann_index for approximate neighbours on large catalogues (optional).
+    - related (dict): Precomputed neighbour tables from neighbour_table.open_neighbour_tables (optional).
+
+    Returns:
+    - recommendations_df (DataFrame): DataFrame of recommended tracks, most similar first.
+    """
+    # Step 1 & 2: Catalogue and Genre Feature Index (precomputed at startup when available)
+    if index is None:
+        index = build_track_index(build_catalogue(df, genres_list))
+    catalogue = index['catalogue']
     
-    recommendations_df = df[df['Track Name'].isin(list(set(recommendations))[:top_n])]
+    # Step 3: Generate Content-Based Recommendations (every version of a selected name is a seed)
+    seeds = tracks_for_names(catalogue, user_interactions)
+    neighbours = similar_tracks(index, seeds, top_n, weights, ann, related)
+    
+    # Step 4 & 5: Preferred genres and top_n
+    recommendations = rank_content_recommendations(catalogue, neighbours, preferred_genres, top_n)
+    
+    recommendations_df = df.iloc[catalogue['track_rows'][recommendations]]
     return recommendations_df
 
 
+# Scores ranked per top-k pass of hybrid_scores_batch, (request, genre) rows beyond it go to further passes
+MAX_BATCH_SCORES = 4_000_000
+
+
+@instrumented
+def hybrid_scores_batch(index, seed_lists, genre_lists, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5):
+    """
+    Fuses popularity and content similarity for several requests at once: the seed rows of every request are
+    scored in one sparse product and every (request, genre) row is ranked in one top-k pass.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - seed_lists (list): One array of dense track IDs per request (may be empty), never recommended back.
+    - genre_lists (list): Genres to rank tracks for, one list per request.
+    - top_n (int): Number of recommendations per genre (default is 10).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - pop_weight (float): Weight of the popularity score (both scores are in [0, 1]).
+    - content_weight (float): Weight of the content score, the highest cosine similarity to any seed track.
+
+    Returns:
+    - results (list): Per request, (tracks, scores) arrays with one row per genre, best first.
+      Slots without a track in the genre score -inf.
+    """
+    catalogue = index['catalogue']
+    n_tracks = len(catalogue['track_genres'])
+    seed_lists = [np.asarray(seeds, dtype=np.intp) for seeds in seed_lists]
+    
+    # Fused score per request and track, the content part is the max over the request's seed rows
+    fused = np.empty((len(seed_lists), n_tracks))
+    fused[:] = pop_weight * index['popularity']
+    with_seeds = [i for i, seeds in enumerate(seed_lists) if len(seeds)]
+    if with_seeds:
+        features = _weighted_features(index, weights)
+        similarity = (features[np.concatenate([seed_lists[i] for i in with_seeds])] @ features.T).toarray()
+        starts = np.cumsum([0] + [len(seed_lists[i]) for i in with_seeds[:-1]])
+        fused[with_seeds] = fused[with_seeds] + content_weight * np.maximum.reduceat(similarity, starts, axis=0)
+    
+    # A request's seeds are never recommended back
+    seed_requests = np.repeat(np.arange(len(seed_lists)), [len(seeds) for seeds in seed_lists])
+    fused[seed_requests, np.concatenate(seed_lists + [np.empty(0, dtype=np.intp)])] = -np.inf
+    
+    # One row per (request, genre) over the genre's tracks only, in track ID order so ties break the same way
+    # as over all tracks. Rows of smaller genres are padded with -inf.
+    pair_requests = np.repeat(np.arange(len(genre_lists)), [len(genres) for genres in genre_lists]).astype(np.intp)
+    distinct = {genre: row for row, genre in enumerate(dict.fromkeys(genre for genres in genre_lists for genre in genres))}
+    pair_genres = np.array([distinct[genre] for genres in genre_lists for genre in genres], dtype=np.intp)
+    genre_tracks = [np.flatnonzero(catalogue['track_genres'] & np.uint64(genre_bits(catalogue['genre_positions'], [genre]))) for genre in distinct]
+    sizes = np.array([len(columns) for columns in genre_tracks], dtype=np.intp)
+    genre_columns = np.zeros((len(distinct), max(sizes.max(initial=0), 1)), dtype=np.intp)
+    for row, columns in enumerate(genre_tracks):
+        genre_columns[row, :len(columns)] = columns
+    padding = np.arange(genre_columns.shape[1]) >= sizes[:, None]
+    
+    k = min(top_n, n_tracks)
+    tracks = np.empty((len(pair_requests), k), dtype=np.intp)
+    scores = np.full((len(pair_requests), k), -np.inf)
+    step = max(1, MAX_BATCH_SCORES // genre_columns.shape[1])
+    for start in range(0, len(pair_requests), step):
+        rows = slice(start, start + step)
+        columns = genre_columns[pair_genres[rows]]
+        pair_scores = fused[pair_requests[rows, None], columns]
+        pair_scores[padding[pair_genres[rows]]] = -np.inf
+        top = top_k_indices(pair_scores, k)
+        tracks[rows, :top.shape[1]] = np.take_along_axis(columns, top, axis=1)
+        scores[rows, :top.shape[1]] = np.take_along_axis(pair_scores, top, axis=1)
+    
+    # Slots past a genre's tracks score -inf and hold the lowest track IDs not ranked above them
+    for row in np.flatnonzero(np.isneginf(scores[:, -1])) if k else []:
+        found = np.count_nonzero(np.isfinite(scores[row]))
+        tracks[row, found:] = np.setdiff1d(np.arange(k), tracks[row, :found])[:k - found]
+    
+    bounds = np.cumsum([0] + [len(genres) for genres in genre_lists])
+    return [(tracks[start:stop], scores[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def hybrid_scores(index, seeds, genres, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5):
+    """
+    Fuses popularity and content similarity into one score per track and ranks every genre, see hybrid_scores_batch.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - seeds (array): Dense track IDs the user interacted with (may be empty), never recommended back.
+    - genres (list): Genres to rank tracks for.
+    - top_n (int): Number of recommendations per genre (default is 10).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - pop_weight (float): Weight of the popularity score (both scores are in [0, 1]).
+    - content_weight (float): Weight of the content score, the highest cosine similarity to any seed track.
+
+    Returns:
+    - (tracks, scores): Arrays with one row per genre, best first. Slots without a track in the genre score -inf.
+    """
+    return hybrid_scores_batch(index, [seeds], [genres], top_n, weights, pop_weight, content_weight)[0]
+
+
 # Hybrid Recommendation System
-def hybrid_recommendation_system(df, genres_list, user_interactions=None, preferred_genres=None, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5):
+@instrumented
+def hybrid_recommendation_system(df, genres_list, user_interactions=None, preferred_genres=None, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5, index=None):
     """
     Hybrid recommendation system combining popularity-based and content-based recommendations.
+    Each track scores pop_weight * popularity + content_weight * similarity to the user's tracks (see hybrid_scores).
 
     Parameters:
-    - df (DataFrame): The dataset containing K-pop songs.
+    - df (DataFrame): The dataset containing K-pop songs (the one the index was built from).
     - genres_list (list): List of genres to be used for encoding.
     - user_interactions (list): List of tracks the user has interacted with (optional).
-    - preferred_genres (list): List of genres the user prefers (optional).
+    - preferred_genres (list): List of genres the user prefers (optional, all genres if missing).
     - top_n (int): Number of recommendations to return (default is 10).
     - weights (dict): Weights for each genre in the similarity calculation (optional).
     - pop_weight (float): Weight for the popularity-based recommendation.
     - content_weight (float): Weight for the content-based recommendation.
+    - index (dict): Precomputed index from build_track_index (optional, built from df if missing).
 
     Returns:
-    - combined_recs (dict): Dictionary of recommended tracks by genre with detailed info.
+    - combined_recs (dict): Dictionary of recommended tracks by genre with detailed info and their 'Hybrid Score'.
     """
-    combined_recs = {}
+    if index is None:
+        index = build_track_index(build_catalogue(df, genres_list))
+    catalogue = index['catalogue']
     
-    # Get popularity-based recommendations
-    if preferred_genres:
-        pop_recs = popularity_based_recommendation_system(df, preferred_genres, top_n)
-    else:
-        pop_recs = popularity_based_recommendation_system(df, genres_list, top_n)
+    genres = preferred_genres or genres_list
+    seeds = tracks_for_names(catalogue, user_interactions or [])
+    tracks, scores = hybrid_scores(index, seeds, genres, top_n, weights, pop_weight, content_weight)
     
-    # Print available genres in pop_recs
-    print(f"Available genres in popularity recommendations: {pop_recs.keys()}")
-
-    # Get content-based recommendations if user interactions are provided
-    if user_interactions:
-        content_recs = kpop_content_based_recommendation_system(df, genres_list, user_interactions, preferred_genres, top_n, weights)
-    else:
-        content_recs = []
-
-    for genre in genres_list:
-        if genre in pop_recs:
-            pop_tracks_df = pop_recs[genre]['top_tracks'].head(top_n)
-        else:
-            print(f"Warning: Genre '{genre}' not found in popularity recommendations.")
-            pop_tracks_df = pd.DataFrame(columns=df.columns)
-        
-        if user_interactions:
-            content_tracks_df = df[df['Track Name'].isin(content_recs)]
-        else:
-            content_tracks_df = pd.DataFrame()
-        
-        combined_tracks_df = pd.concat([pop_tracks_df, content_tracks_df]).drop_duplicates().head(top_n)
-        combined_recs[genre] = combined_tracks_df
+    combined_recs = {}
+    for genre, genre_tracks, genre_scores in zip(genres, tracks, scores):
+        found = np.isfinite(genre_scores)
+        if not found.any():
+            print(f"Warning: No tracks found for genre '{genre}'.")
+        combined_recs[genre] = df.iloc[catalogue['track_rows'][genre_tracks[found]]].assign(**{'Hybrid Score': genre_scores[found]})
     
     return combined_recs
@@ -0,0 +1,246 @@
+#Python Script for the stateless recommender object used by the app and the API
+#TrackRecommender holds read-only arrays precomputed from the track index and never writes to them or to the df,
+#so one instance can serve concurrent queries from a thread pool. Tracks are scored through their distinct genre
+#sets: the cosine similarity of two tracks only depends on their genre bitmasks, so the similarities between the
+#(few) distinct bitmasks are precomputed and a query gathers a seed's row onto every track. The N-sized
+#score, mask and top-k work arrays come from a small pool of sets reused by whichever thread queries next, so once
+#the pool is warm a query only allocates its results, i.e. memory in O(top_n + seeds) rather than O(N).
+#Results equal recommendation_system's functions.
+
+#Import necessary libraries
+import threading
+from contextlib import contextmanager
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from catalogue import tracks_for_names
+from genre_filter import genre_bits
+from neighbour_table import lookup_neighbours
+from recommendation_system import _normalize_rows, rank_content_recommendations
+from instrumentation import instrumented
+
+# Above this many distinct genre sets the mask x mask similarity table is not kept (MAX_TABLE_MASKS^2 floats),
+# a seed's row is then scored against the distinct genre sets per query
+MAX_TABLE_MASKS = 2048
+MAX_POOLED_BUFFERS = 8  # Work array sets kept for reuse, about 41 bytes per track each
+
+
+def _read_only(array):
+    view = np.asarray(array).view()
+    view.flags.writeable = False
+    return view
+
+
+class TrackRecommender:
+    """
+    Content-based and hybrid recommendations over one catalogue, safe to share between threads.
+
+    Parameters:
+    - df (DataFrame): The dataset containing K-pop songs (the one the index was built from), never modified.
+    - index (dict): Index returned by recommendation_system.build_track_index.
+    - related (dict): Precomputed neighbour tables from neighbour_table.open_neighbour_tables (optional).
+    """
+    def __init__(self, df, index, related=None):
+        self.df = df
+        self.index = index
+        self.catalogue = index['catalogue']
+        self.genres = list(index['genres'])
+        self.related = related
+        catalogue = self.catalogue
+
+        # Distinct genre bitmasks and the one of every track
+        masks, track_codes = np.unique(catalogue['track_genres'], return_inverse=True)
+        self.n_tracks = len(track_codes)
+        # Left writeable: np.take copies read-only indices on every call. It is never written after this line.
+        self.track_codes = track_codes.astype(np.intp).ravel()
+        self.track_genres = _read_only(catalogue['track_genres'])
+        self.track_rows = _read_only(catalogue['track_rows'])
+        self.popularity = _read_only(index['popularity'])
+        bits = np.arange(len(self.genres), dtype=np.uint64)
+        self.mask_counts = csr_matrix(((masks[:, None] >> bits) & np.uint64(1)).astype(np.float64))
+        self.mask_features = _normalize_rows(self.mask_counts)
+
+        # Cosine similarity between distinct genre sets, same products in the same order as the track index
+        self.similarity = None
+        if len(masks) <= MAX_TABLE_MASKS:
+            self.similarity = _read_only((self.mask_features @ self.mask_features.T).toarray())
+
+        # Free work array sets, shared by all threads (Streamlit runs every rerun in a new thread)
+        self._pool = []
+        self._pool_lock = threading.Lock()
+
+    # Catalogue-sized work arrays for one query, taken from the pool or allocated when every set is in use
+    @contextmanager
+    def _buffers(self):
+        with self._pool_lock:
+            buffers = self._pool.pop() if self._pool else None
+        if buffers is None:
+            n_tracks, n_masks = self.n_tracks, self.mask_features.shape[0]
+            buffers = {
+                'scores': np.empty(n_tracks),
+                'work': np.empty(n_tracks),
+                'partition': np.empty(n_tracks),
+                'mask': np.empty(n_tracks, dtype=bool),
+                'bits': np.empty(n_tracks, dtype=np.uint64),
+                'ranks': np.empty(n_tracks, dtype=np.intp),
+                'content': np.empty(n_masks),
+            }
+        try:
+            yield buffers
+        finally:
+            # Sets beyond MAX_POOLED_BUFFERS (after a burst of concurrent queries) are released
+            with self._pool_lock:
+                if len(self._pool) < MAX_POOLED_BUFFERS:
+                    self._pool.append(buffers)
+
+    # Per-query similarity rows against the distinct genre sets (the table rows when unweighted)
+    def _mask_rows(self, weights):
+        if not weights and self.similarity is not None:
+            return lambda code: self.similarity[code]
+        features = self.mask_features
+        if weights:
+            column_weights = np.array([weights.get(genre, 1.0) for genre in self.genres], dtype=float)
+            features = _normalize_rows(self.mask_counts @ diags(column_weights))
+        return lambda code: (features[code] @ features.T).toarray().ravel()
+
+    def _top_k(self, scores, k, buffers):
+        # Same selection and tie order as recommendation_system.top_k_indices, in the query's buffers
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        partition, mask, ranks = buffers['partition'], buffers['mask'], buffers['ranks']
+        np.copyto(partition, scores)
+        partition.partition(len(scores) - k)
+        kth = partition[len(scores) - k]
+
+        # Everything above the k-th largest value is in, ties at it are filled in index order
+        above = np.flatnonzero(np.greater(scores, kth, out=mask))
+        needed = k - len(above)
+        np.equal(scores, kth, out=mask)
+        if np.count_nonzero(mask) == needed:
+            tied = np.flatnonzero(mask)
+        else:
+            # Running count of the ties (cast into the int buffer first, cumsum of a bool array allocates)
+            np.copyto(ranks, mask)
+            np.cumsum(ranks, out=ranks)
+            tied = np.searchsorted(ranks, np.arange(1, needed + 1))
+        indices = np.sort(np.concatenate([above, tied]))
+        return indices[np.argsort(-scores[indices], kind='stable')]
+
+    @instrumented
+    def similar_tracks(self, seeds, top_n=10, weights=None):
+        """
+        Finds the most similar tracks for each seed track, see recommendation_system.similar_tracks.
+
+        Parameters:
+        - seeds (array): Dense track IDs to find neighbours for.
+        - top_n (int): Number of neighbours per seed track (default is 10).
+        - weights (dict): Weights for each genre in the similarity calculation (optional).
+
+        Returns:
+        - neighbours (array): Dense track IDs, one row per seed track, most similar first (other seeds excluded).
+        """
+        seeds = np.asarray(seeds, dtype=np.intp)
+        if len(seeds) == 0:
+            return np.empty((0, 0), dtype=np.intp)
+        if self.related:
+            neighbours = lookup_neighbours(self.related, self.index, seeds, top_n, weights)
+            if neighbours is not None:
+                return neighbours
+
+        mask_row = self._mask_rows(weights)
+        k = min(top_n, self.n_tracks - len(np.unique(seeds)))
+        neighbours = np.empty((len(seeds), max(k, 0)), dtype=np.intp)
+        with self._buffers() as buffers:
+            scores = buffers['scores']
+            for row, seed in enumerate(seeds):
+                np.take(mask_row(self.track_codes[seed]), self.track_codes, out=scores, mode='clip')
+                scores[seeds] = -np.inf
+                neighbours[row] = self._top_k(scores, k, buffers)
+        return neighbours
+
+    @instrumented
+    def hybrid_scores(self, seeds, genres, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5):
+        """
+        Fuses popularity and content similarity and ranks every genre, see recommendation_system.hybrid_scores.
+
+        Parameters:
+        - seeds (array): Dense track IDs the user interacted with (may be empty), never recommended back.
+        - genres (list): Genres to rank tracks for.
+        - top_n (int): Number of recommendations per genre (default is 10).
+        - weights (dict): Weights for each genre in the similarity calculation (optional).
+        - pop_weight (float): Weight of the popularity score.
+        - content_weight (float): Weight of the content score, the highest cosine similarity to any seed track.
+
+        Returns:
+        - (tracks, scores): Arrays with one row per genre, best first. Slots without a track in the genre score -inf.
+        """
+        seeds = np.asarray(seeds, dtype=np.intp)
+        k = min(top_n, self.n_tracks)
+        tracks = np.empty((len(genres), k), dtype=np.intp)
+        scores = np.empty((len(genres), k))
+        with self._buffers() as buffers:
+            fused, work, mask, bits = buffers['scores'], buffers['work'], buffers['mask'], buffers['bits']
+            np.multiply(self.popularity, pop_weight, out=fused)
+            if len(seeds):
+                # Highest similarity to any seed per genre set, then gathered onto the tracks
+                content, mask_row = buffers['content'], self._mask_rows(weights)
+                np.copyto(content, mask_row(self.track_codes[seeds[0]]))
+                for seed in seeds[1:]:
+                    np.maximum(content, mask_row(self.track_codes[seed]), out=content)
+                np.multiply(content, content_weight, out=content)
+                np.take(content, self.track_codes, out=work, mode='clip')
+                np.add(fused, work, out=fused)
+
+            for row, genre in enumerate(genres):
+                # Tracks outside the genre and the seeds score -inf
+                genre_mask = np.uint64(genre_bits(self.catalogue['genre_positions'], [genre]))
+                np.equal(np.bitwise_and(self.track_genres, genre_mask, out=bits), 0, out=mask)
+                np.copyto(work, fused)
+                np.copyto(work, -np.inf, where=mask)
+                work[seeds] = -np.inf
+                tracks[row] = self._top_k(work, k, buffers)
+                scores[row] = work[tracks[row]]
+        return tracks, scores
+
+    def content_recommendations(self, user_interactions, preferred_genres=None, top_n=10, weights=None):
+        """
+        Content-based recommendations, same result as recommendation_system.kpop_content_based_recommendation_system.
+
+        Parameters:
+        - user_interactions (list): List of tracks (names) the user has interacted with.
+        - preferred_genres (list): List of genres the user prefers (optional).
+        - top_n (int): Number of recommendations to return (default is 10).
+        - weights (dict): Weights for each genre in the similarity calculation (optional).
+
+        Returns:
+        - recommendations_df (DataFrame): DataFrame of recommended tracks, most similar first.
+        """
+        neighbours = self.similar_tracks(tracks_for_names(self.catalogue, user_interactions), top_n, weights)
+        recommendations = rank_content_recommendations(self.catalogue, neighbours, preferred_genres, top_n)
+        return self.df.iloc[self.track_rows[recommendations]]
+
+    def hybrid_recommendations(self, user_interactions=None, preferred_genres=None, top_n=10, weights=None, pop_weight=0.5, content_weight=0.5):
+        """
+        Hybrid recommendations per genre, same result as recommendation_system.hybrid_recommendation_system.
+
+        Parameters:
+        - user_interactions (list): List of tracks the user has interacted with (optional).
+        - preferred_genres (list): List of genres the user prefers (optional, all genres if missing).
+        - top_n (int): Number of recommendations to return (default is 10).
+        - weights (dict): Weights for each genre in the similarity calculation (optional).
+        - pop_weight (float): Weight for the popularity-based recommendation.
+        - content_weight (float): Weight for the content-based recommendation.
+
+        Returns:
+        - combined_recs (dict): Dictionary of recommended tracks by genre with detailed info and their 'Hybrid Score'.
+        """
+        genres = preferred_genres or self.genres
+        seeds = tracks_for_names(self.catalogue, user_interactions or [])
+        tracks, scores = self.hybrid_scores(seeds, genres, top_n, weights, pop_weight, content_weight)
+
+        combined_recs = {}
+        for genre, genre_tracks, genre_scores in zip(genres, tracks, scores):
+            found = np.isfinite(genre_scores)
+            if not found.any():
+                print(f"Warning: No tracks found for genre '{genre}'.")
+            combined_recs[genre] = self.df.iloc[self.track_rows[genre_tracks[found]]].assign(**{'Hybrid Score': genre_scores[found]})
+        return combined_recs
@@ -0,0 +1,146 @@
+#Python Script for the offline "related tracks" export
+#Computes the top-k most similar tracks for every track of the catalogue. The catalogue is split into row blocks
+#scored across a process pool; the feature matrix is shared with the workers through shared memory, so each
+#worker holds one block x N score matrix at a time instead of the full N x N similarity matrix. Blocks are sized so
+#that all workers together stay within MAX_MEMORY_BYTES, counting the copies top_k_indices makes of a block.
+#Tables are stored per genre weight setting and served online by neighbour_table.py.
+#Usage: python related_tracks.py --top-k 50 --workers 4 [--weights '{"trot": 2}']
+
+#Import necessary libraries
+import os
+import json
+import argparse
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from scipy.sparse import csr_matrix
+from recommendation_system import top_k_indices, _weighted_features
+from neighbour_table import RELATED_DIR, weights_key, index_fingerprint
+
+TOP_K = 50
+MAX_MEMORY_BYTES = 1024 * 1024 * 1024  # Scoring memory of all workers together
+MAX_WORKERS = 8  # Default pool size cap, more workers only make the blocks smaller
+# Peak bytes per block score while a block is scored: the float64 scores plus the copy, partition,
+# masks and cumsum of top_k_indices (measured with tracemalloc, 5.25 x 8 bytes)
+BYTES_PER_SCORE = 42
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+# Feature matrix attached in each worker process
+_worker_features = None
+_worker_segments = []
+
+
+# Copies the CSR arrays of the feature matrix into shared memory blocks
+def _share_features(features):
+    segments, spec = [], {'shape': features.shape}
+    for name in ('data', 'indices', 'indptr'):
+        array = getattr(features, name)
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def _attach_features(spec):
+    global _worker_features, _worker_segments
+    arrays = {}
+    for name in ('data', 'indices', 'indptr'):
+        segment_name, shape, dtype = spec[name]
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    _worker_features = csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=spec['shape'], copy=False)
+
+
+# Top-k neighbours of one row block, a track is never its own neighbour
+def _score_block(task):
+    start, stop, top_k = task
+    # Dense block times the sparse features gives the dense scores directly, no sparse product in between
+    scores = _worker_features[start:stop].toarray() @ _worker_features.T
+    scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+    neighbours = top_k_indices(scores, top_k)
+    return start, neighbours.astype(np.int32), np.take_along_axis(scores, neighbours, axis=1).astype(np.float32)
+
+
+def compute_related_tracks(index, top_k=TOP_K, weights=None, output_dir=None, workers=None, block_size=None):
+    """
+    Computes and writes the top-k neighbours of every track in the catalogue.
+
+    Parameters:
+    - index (dict): Index returned by build_track_index.
+    - top_k (int): Neighbours kept per track (default is 50).
+    - weights (dict): Weights for each genre in the similarity calculation (optional).
+    - output_dir (str): Directory for the neighbour files (default is data/cache/related_tracks/<weights key>).
+    - workers (int): Worker processes (default is the number of CPUs, at most MAX_WORKERS).
+    - block_size (int): Rows scored per task (default keeps all workers within MAX_MEMORY_BYTES).
+
+    Returns:
+    - meta (dict): Description of the written files: neighbours.npy (int32 dense track IDs) and
+      scores.npy (float32 cosine similarities), both N x top_k, row = dense track ID, most similar first.
+    """
+    key = weights_key(weights, index['genres'])
+    output_dir = output_dir or os.path.join(RELATED_DIR, key)
+    features = csr_matrix(_weighted_features(index, weights))
+    n_tracks = features.shape[0]
+    top_k = min(top_k, n_tracks - 1)
+    workers = workers or min(os.cpu_count(), MAX_WORKERS)
+    block_size = block_size or min(n_tracks, max(1, MAX_MEMORY_BYTES // (workers * BYTES_PER_SCORE * n_tracks)))
+
+    os.makedirs(output_dir, exist_ok=True)
+    # meta.json is written last, a crashed or running build is never opened as a valid table
+    meta_file = os.path.join(output_dir, 'meta.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    neighbours = np.lib.format.open_memmap(os.path.join(output_dir, 'neighbours.npy'), mode='w+', dtype=np.int32, shape=(n_tracks, top_k))
+    scores = np.lib.format.open_memmap(os.path.join(output_dir, 'scores.npy'), mode='w+', dtype=np.float32, shape=(n_tracks, top_k))
+
+    tasks = [(start, min(start + block_size, n_tracks), top_k) for start in range(0, n_tracks, block_size)]
+    segments, spec = _share_features(features)
+    try:
+        with Pool(workers, initializer=_attach_features, initargs=(spec,)) as pool:
+            # Blocks are written as they finish, only one block per worker is in memory
+            for start, block_neighbours, block_scores in pool.imap_unordered(_score_block, tasks):
+                neighbours[start:start + len(block_neighbours)] = block_neighbours
+                scores[start:start + len(block_scores)] = block_scores
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+    neighbours.flush()
+    scores.flush()
+
+    meta = {
+        'tracks': n_tracks,
+        'top_k': top_k,
+        'weights': weights or {},
+        'weights_key': key,
+        'fingerprint': index_fingerprint(index),
+        'block_size': block_size,
+    }
+    with open(meta_file + '.tmp', 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(meta_file + '.tmp', meta_file)
+    return meta
+
+
+# Run the script
+if __name__ == "__main__":
+    from catalogue_cache import load_or_build_catalogue
+    from catalogue import build_catalogue
+    from recommendation_system import build_track_index
+
+    parser = argparse.ArgumentParser(description='Export the top-k related tracks of every track.')
+    parser.add_argument('--output', default=None, help='default is data/cache/related_tracks/<weights key>')
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--block-size', type=int, default=None)
+    parser.add_argument('--weights', type=json.loads, default=None, help='genre weights as JSON, e.g. \'{"trot": 2}\'')
+    args = parser.parse_args()
+
+    df = load_or_build_catalogue('data/all_artists_data.csv', 'data/all_tracks_data.csv', genres_list)
+    index = build_track_index(build_catalogue(df, genres_list))
+    meta = compute_related_tracks(index, args.top_k, args.weights, args.output, args.workers, args.block_size)
+    print(f"Wrote the top {meta['top_k']} related tracks of {meta['tracks']} tracks (weights key {meta['weights_key']}, blocks of {meta['block_size']} rows)")
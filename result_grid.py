@@ -0,0 +1,92 @@
+#Python Script for the result grid of the streamlit app
+#One component renders every list of tracks or artists in the app: results are paged, only the current page is
+#turned into card dicts (column-wise, no iterrows) and drawn, and its thumbnails come from the ThumbnailCache
+#while the next page is prefetched in the background. Render time depends on the page size, not on top_n.
+
+#Import necessary libraries
+import math
+import streamlit as st
+from instrumentation import stage
+
+PAGE_SIZE = 10
+CARDS_PER_ROW = 5
+
+# Columns of each kind of result
+CARD_LAYOUTS = {
+    'track': {'id': 'Track ID', 'title': 'Track Name', 'image': 'Track Image', 'link': 'https://open.spotify.com/track/'},
+    'artist': {'id': 'Artist ID', 'title': 'Artist Name', 'image': 'Artist Image', 'link': 'https://open.spotify.com/artist/'},
+}
+
+
+def _column(df, column):
+    return df[column].tolist() if column in df.columns else [None] * len(df)
+
+
+def prepare_cards(df, kind, fields=(), start=0, stop=None):
+    """
+    Builds the card dicts of a slice of results, one column at a time.
+
+    Parameters:
+    - df (pd.DataFrame): Ranked tracks or artists.
+    - kind (str): 'track' or 'artist'.
+    - fields (list): (label, column) pairs written under the title, e.g. [('Artist', 'Artist Name')].
+    - start (int): First row of the slice (default is 0).
+    - stop (int): End of the slice (default is the last row).
+
+    Returns:
+    - cards (list): Dicts with rank, title, image, link and lines.
+    """
+    layout = CARD_LAYOUTS[kind]
+    page = df.iloc[start:stop]
+    lines = [[f"{label}: {value}" for value in _column(page, column)] for label, column in fields]
+    return [
+        {
+            'rank': start + position + 1,
+            'title': title,
+            'image': image if isinstance(image, str) and image else None,
+            'link': f"{layout['link']}{item_id}",
+            'lines': [field_lines[position] for field_lines in lines],
+        }
+        for position, (title, image, item_id) in enumerate(zip(_column(page, layout['title']), _column(page, layout['image']),
+                                                              _column(page, layout['id'])))
+    ]
+
+
+def render_grid(df, kind, fields=(), key='results', thumbnails=None, page_size=PAGE_SIZE, per_row=CARDS_PER_ROW):
+    """
+    Renders one page of results as rows of cards, with a page selector when there is more than one page.
+
+    Parameters:
+    - df (pd.DataFrame): Ranked tracks or artists.
+    - kind (str): 'track' or 'artist'.
+    - fields (list): (label, column) pairs written under the title.
+    - key (str): Unique widget key of this grid, include the query so a new query starts on page 1.
+    - thumbnails (ThumbnailCache): Image cache (optional, images are linked by URL without it).
+    - page_size (int): Results per page (default is 10).
+    - per_row (int): Cards per row (default is 5).
+    """
+    n_pages = max(1, math.ceil(len(df) / page_size))
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"{key}-page")
+    start = (page - 1) * page_size
+
+    with stage('app.render_grid'):
+        cards = prepare_cards(df, kind, fields, start, start + page_size)
+        images = {}
+        if thumbnails is not None:
+            with stage('app.thumbnails'):
+                images = thumbnails.get_many([card['image'] for card in cards])
+            if page < n_pages:
+                thumbnails.prefetch(_column(df.iloc[start + page_size:start + 2 * page_size], CARD_LAYOUTS[kind]['image']))
+
+        for row_start in range(0, len(cards), per_row):
+            for col, card in zip(st.columns(per_row), cards[row_start:row_start + per_row]):
+                # Cached thumbnail bytes, or the remote URL when the image could not be fetched
+                image = images.get(card['image']) or card['image']
+                if image is not None:
+                    col.image(image, width='stretch')
+                col.write(f"**{card['rank']}. {card['title']}**")
+                for line in card['lines']:
+                    col.write(line)
+                col.write(f"[Listen on Spotify]({card['link']})")
@@ -0,0 +1,218 @@
+#Python Script to generate large synthetic artist/track datasets for scaling tests
+#Writes all_artists_data.csv and all_tracks_data.csv with the exact columns of data_retrieve.fetch_data_by_genre,
+#chunk by chunk, so 10M-row fixtures never have to fit in memory. Distributions are fitted on the bundled data/:
+#genre combinations of artists, popularity vs followers, track popularity vs artist popularity, artists per
+#track (featured artists), durations, reused track names and rows repeated under several queried genres.
+#Usage: python synthetic_catalogue.py --artists 100000 --tracks 10000000 --output data/synthetic
+
+#Import necessary libraries
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from crawl_schema import ARTIST_COLUMNS, TRACK_COLUMNS
+
+CHUNK_SIZE = 100_000
+ALBUMS_PER_ARTIST = 8
+BASE62 = np.array(list('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'))
+
+genres_list = ['k-pop', 'k-pop boy group', 'k-pop girl group', '5th gen k-pop', 'classic k-pop',
+               'korean r&b', 'k-rap', 'korean ost', 'korean pop', 'classic korean pop', 'k-indie',
+               'trot', 'k-pop ballad', 'korean soundtrack']
+
+
+def fit_profile(artists_file='data/all_artists_data.csv', tracks_file='data/all_tracks_data.csv'):
+    """
+    Fits the distributions the generator samples from on a crawled dataset.
+
+    Parameters:
+    - artists_file (str): Path to all_artists_data.csv.
+    - tracks_file (str): Path to all_tracks_data.csv.
+
+    Returns:
+    - profile (dict): Empirical distributions and linear fits (see the keys below).
+    """
+    artists = pd.read_csv(artists_file)
+    tracks = pd.read_csv(tracks_file)
+    unique_artists = artists.drop_duplicates('Artist ID')
+    unique_tracks = tracks.drop_duplicates('Track ID')
+
+    # log10(followers + 1) ~ popularity
+    popularity = unique_artists['Popularity'].to_numpy(dtype=float)
+    log_followers = np.log10(unique_artists['Followers'].fillna(0).to_numpy(dtype=float) + 1)
+    followers_fit = np.polyfit(popularity, log_followers, 1)
+
+    # Track popularity ~ popularity of its first artist
+    first_artist = unique_tracks['Artists'].fillna('').str.split(', ').str[0]
+    artist_popularity = first_artist.map(unique_artists.set_index('Artist Name')['Popularity'].groupby(level=0).max())
+    matched = artist_popularity.notna()
+    track_fit = np.polyfit(artist_popularity[matched], unique_tracks['Popularity'][matched], 1)
+
+    genre_sets = unique_artists['Genres'].fillna('').value_counts(normalize=True)
+    artists_per_track = (unique_tracks['Artists'].fillna('').str.count(', ') + 1).value_counts(normalize=True).sort_index()
+    log_duration = np.log(unique_tracks['Duration (ms)'].to_numpy(dtype=float))
+    return {
+        'genre_sets': genre_sets.index.to_numpy(dtype=object),
+        'genre_set_p': genre_sets.to_numpy(),
+        'artist_popularity': popularity,
+        'followers_fit': (followers_fit, np.std(log_followers - np.polyval(followers_fit, popularity))),
+        'max_log_followers': log_followers.max(),
+        'track_fit': (track_fit, np.std(unique_tracks['Popularity'][matched] - np.polyval(track_fit, artist_popularity[matched]))),
+        'artists_per_track': artists_per_track.index.to_numpy(),
+        'artists_per_track_p': artists_per_track.to_numpy(),
+        'duration': (log_duration.mean(), log_duration.std()),
+        'track_numbers': unique_tracks['Track Number'].to_numpy(),
+        'name_reuse_rate': unique_tracks['Track Name'].duplicated().mean(),
+        'artist_repeat_rate': artists['Artist ID'].duplicated().mean(),
+        'track_repeat_rate': tracks['Track ID'].duplicated().mean(),
+    }
+
+
+# Deterministic 22-character base62 IDs like Spotify's, distinct per (kind, number)
+def spotify_ids(numbers, kind):
+    numbers = (np.asarray(numbers, dtype=np.uint64) + np.uint64(1)) * np.uint64(4) + np.uint64(kind)
+    digits = np.empty((len(numbers), 22), dtype='<U1')
+    # Two odd multipliers scramble the number (mod 2**64 it is a bijection), 11 base62 digits hold 64 bits
+    with np.errstate(over='ignore'):
+        halves = [numbers * np.uint64(0x9E3779B97F4A7C15), numbers * np.uint64(0xC2B2AE3D27D4EB4F)]
+    for half, mixed in enumerate(halves):
+        for position in range(11 * half + 10, 11 * half - 1, -1):
+            digits[:, position] = BASE62[(mixed % np.uint64(62)).astype(np.intp)]
+            mixed = mixed // np.uint64(62)
+    return digits.view('<U22').ravel().astype(object)
+
+
+# Genre Queried: a searched genre of the row's genre set, otherwise any searched genre
+def _queried_genres(genre_sets, genre_set_codes, rng):
+    candidates = [[genre for genre in genres.split(', ') if genre in genres_list] or genres_list for genres in genre_sets]
+    counts = np.array([len(genres) for genres in candidates])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    flat = np.array([genre for genres in candidates for genre in genres], dtype=object)
+    return flat[offsets[genre_set_codes] + (rng.random(len(genre_set_codes)) * counts[genre_set_codes]).astype(np.intp)]
+
+
+# Rows queried under several genres show up again with another Genre Queried, like in the crawl
+def _repeat_rows(chunk, rate, rng):
+    repeats = chunk[rng.random(len(chunk)) < rate].copy()
+    repeats['Genre Queried'] = rng.choice(genres_list, len(repeats))
+    return pd.concat([chunk, repeats]).sort_index(kind='stable').reset_index(drop=True)
+
+
+class SyntheticCatalogue:
+    """
+    Generator of synthetic artists and tracks. Artist attributes are kept in memory (O(artists)),
+    tracks are produced chunk by chunk.
+
+    Parameters:
+    - n_artists (int): Number of distinct artists.
+    - n_tracks (int): Number of distinct tracks.
+    - profile (dict): Distributions from fit_profile (default fits the bundled data/).
+    - seed (int): Random seed, the same seed gives the same files.
+    """
+    def __init__(self, n_artists, n_tracks, profile=None, seed=42):
+        self.n_artists = n_artists
+        self.n_tracks = n_tracks
+        self.profile = profile or fit_profile()
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+
+        self.artist_ids = spotify_ids(np.arange(n_artists), kind=0)
+        self.artist_names = np.array([f'Synthetic Artist {i}' for i in range(n_artists)], dtype=object)
+        self.artist_popularity = rng.choice(self.profile['artist_popularity'], n_artists)
+        self.artist_genre_sets = rng.choice(len(self.profile['genre_sets']), n_artists, p=self.profile['genre_set_p'])
+
+        # Popular artists release more tracks and get featured more often
+        weights = np.exp(self.artist_popularity / 20)
+        self.artist_cdf = np.cumsum(weights) / weights.sum()
+
+    def _sample_artists(self, rng, size):
+        return np.minimum(np.searchsorted(self.artist_cdf, rng.random(size)), self.n_artists - 1)
+
+    def iter_artists(self, chunk_size=CHUNK_SIZE):
+        rng = np.random.default_rng([self.seed, 1])
+        (slope, intercept), noise = self.profile['followers_fit']
+        for start in range(0, self.n_artists, chunk_size):
+            artists = np.arange(start, min(start + chunk_size, self.n_artists))
+            popularity = self.artist_popularity[artists]
+            log_followers = slope * popularity + intercept + rng.normal(0, noise, len(artists))
+            log_followers = np.clip(log_followers, 0, self.profile['max_log_followers'])
+            chunk = pd.DataFrame({
+                'Artist Name': self.artist_names[artists],
+                'Artist ID': self.artist_ids[artists],
+                'Popularity': popularity.astype(int),
+                'Followers': (10 ** log_followers - 1).astype(np.int64),
+                'Genres': self.profile['genre_sets'][self.artist_genre_sets[artists]],
+                'Genre Queried': _queried_genres(self.profile['genre_sets'], self.artist_genre_sets[artists], rng),
+                'Artist Image': 'https://i.scdn.co/image/synthetic-' + self.artist_ids[artists],
+            }, index=artists)
+            yield _repeat_rows(chunk, self.profile['artist_repeat_rate'], rng)[ARTIST_COLUMNS]
+
+    def iter_tracks(self, chunk_size=CHUNK_SIZE):
+        rng = np.random.default_rng([self.seed, 2])
+        (slope, intercept), noise = self.profile['track_fit']
+        for start in range(0, self.n_tracks, chunk_size):
+            tracks = np.arange(start, min(start + chunk_size, self.n_tracks))
+            size = len(tracks)
+            main_artist = self._sample_artists(rng, size)
+
+            # Featured artists appended to the main artist's name, like ', '.join of the API's artists
+            artists = self.artist_names[main_artist].copy()
+            n_artists = rng.choice(self.profile['artists_per_track'], size, p=self.profile['artists_per_track_p'])
+            for extra in range(1, n_artists.max()):
+                featured = n_artists > extra
+                artists[featured] = artists[featured] + ', ' + self.artist_names[self._sample_artists(rng, featured.sum())]
+
+            # Some tracks reuse an earlier name (versions, remasters, covers)
+            name_numbers = tracks - np.where(rng.random(size) < self.profile['name_reuse_rate'], rng.integers(1, 50, size), 0)
+            album = main_artist * ALBUMS_PER_ARTIST + rng.integers(0, ALBUMS_PER_ARTIST, size)
+            album_ids = spotify_ids(album, kind=2)
+            track_ids = spotify_ids(tracks, kind=1)
+            popularity = slope * self.artist_popularity[main_artist] + intercept + rng.normal(0, noise, size)
+
+            chunk = pd.DataFrame({
+                'Track Name': 'Synthetic Track ' + pd.Series(np.maximum(name_numbers, 0)).astype(str).to_numpy(dtype=object),
+                'Track ID': track_ids,
+                'Duration (ms)': np.exp(rng.normal(*self.profile['duration'], size)).astype(np.int64),
+                'Popularity': np.clip(np.round(popularity), 0, 100).astype(int),
+                'Track Number': rng.choice(self.profile['track_numbers'], size),
+                'URI': 'spotify:track:' + track_ids,
+                'Album Name': 'Synthetic Album ' + pd.Series(album).astype(str).to_numpy(dtype=object),
+                'Album ID': album_ids,
+                'Artists': artists,
+                'Genre Queried': _queried_genres(self.profile['genre_sets'], self.artist_genre_sets[main_artist], rng),
+                'Track Image': 'https://i.scdn.co/image/synthetic-' + album_ids,
+            }, index=tracks)
+            yield _repeat_rows(chunk, self.profile['track_repeat_rate'], rng)[TRACK_COLUMNS]
+
+    def write(self, output_dir, chunk_size=CHUNK_SIZE):
+        """
+        Streams the dataset to output_dir/all_artists_data.csv and output_dir/all_tracks_data.csv.
+
+        Returns:
+        - (artists_file, tracks_file, rows): Paths and the number of rows written per file.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        files = (os.path.join(output_dir, 'all_artists_data.csv'), os.path.join(output_dir, 'all_tracks_data.csv'))
+        rows = {}
+        for path, chunks in zip(files, (self.iter_artists(chunk_size), self.iter_tracks(chunk_size))):
+            rows[path] = 0
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                for i, chunk in enumerate(chunks):
+                    chunk.to_csv(f, header=(i == 0), index=False)
+                    rows[path] += len(chunk)
+        return files[0], files[1], rows
+
+
+# Run the script
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a synthetic Spotify artist/track dataset.')
+    parser.add_argument('--artists', type=int, default=10_000)
+    parser.add_argument('--tracks', type=int, default=100_000)
+    parser.add_argument('--output', default='data/synthetic')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    generator = SyntheticCatalogue(args.artists, args.tracks, seed=args.seed)
+    artists_file, tracks_file, rows = generator.write(args.output, args.chunk_size)
+    print(f"Wrote {rows[artists_file]} artist rows to {artists_file} and {rows[tracks_file]} track rows to {tracks_file}")
@@ -0,0 +1,209 @@
+#Python Script for the thumbnail cache of the app
+#Track and artist images are fetched once, downscaled and kept in a bounded in-memory LRU backed by a bounded
+#disk cache (data/cache/thumbnails), so reruns of the app never download the same image again.
+#Fetches run concurrently on a thread pool; prefetch() warms the cache for the next page in the background.
+
+#Import necessary libraries
+import io
+import os
+import time
+import hashlib
+import threading
+import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow the original image bytes are cached
+    Image = None
+
+THUMBNAIL_DIR = 'data/cache/thumbnails'
+THUMBNAIL_SIZE = 300            # Longest side in pixels
+MAX_MEMORY_ENTRIES = 512
+MAX_DISK_BYTES = 64 * 1024 * 1024
+FAILURE_TTL = 60                # Seconds before a failed URL is tried again
+
+
+# Longest side reduced to max_size, re-encoded as JPEG
+def downscale(content, max_size=THUMBNAIL_SIZE):
+    if Image is None:
+        return content
+    with Image.open(io.BytesIO(content)) as image:
+        image.thumbnail((max_size, max_size))
+        output = io.BytesIO()
+        image.convert('RGB').save(output, format='JPEG', quality=85)
+    return output.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thread-safe thumbnail cache: memory LRU -> disk -> HTTP fetch.
+    Failed fetches return None and are retried after FAILURE_TTL seconds.
+
+    Parameters:
+    - cache_dir (str): Directory of the downscaled images (default is data/cache/thumbnails).
+    - max_size (int): Longest side of a thumbnail in pixels (default is 300).
+    - max_entries (int): Thumbnails kept in memory, the least recently used is evicted first.
+    - max_disk_bytes (int): Size bound of the disk cache, the least recently used files are deleted first.
+    - workers (int): Concurrent fetches (default is 8).
+    - timeout (float): Seconds per HTTP request (default is 5).
+    """
+    def __init__(self, cache_dir=THUMBNAIL_DIR, max_size=THUMBNAIL_SIZE, max_entries=MAX_MEMORY_ENTRIES,
+                 max_disk_bytes=MAX_DISK_BYTES, workers=8, timeout=5):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.timeout = timeout
+        self._memory = OrderedDict()
+        self._failures = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnail')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.fetches = 0
+        self.failures = 0
+
+        # Disk usage, oldest file first
+        os.makedirs(cache_dir, exist_ok=True)
+        files = sorted(os.scandir(cache_dir), key=lambda entry: entry.stat().st_mtime)
+        self._disk = OrderedDict((entry.path, entry.stat().st_size) for entry in files if entry.is_file())
+        self._disk_bytes = sum(self._disk.values())
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(f'{url}|{self.max_size}'.encode()).hexdigest() + '.jpg')
+
+    def _remember(self, url, content):
+        with self._lock:
+            self._memory[url] = content
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, path, content):
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(content)
+        os.replace(temporary, path)
+        with self._lock:
+            self._disk_bytes += len(content) - self._disk.pop(path, 0)
+            self._disk[path] = len(content)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_path, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+
+    # Disk, then network; runs on the thread pool
+    def _load(self, url):
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            with self._lock:
+                self.disk_hits += 1
+                if path in self._disk:
+                    self._disk.move_to_end(path)
+            os.utime(path)
+        except FileNotFoundError:
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                content = downscale(response.content, self.max_size)
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                    self._failures[url] = time.monotonic() + FAILURE_TTL
+                return None
+            with self._lock:
+                self.fetches += 1
+            self._store(path, content)
+        self._remember(url, content)
+        return content
+
+    def _finish(self, url):
+        with self._lock:
+            self._pending.pop(url, None)
+
+    # Future of a URL that is not in memory; concurrent requests for one URL share the fetch
+    def _submit(self, url):
+        with self._lock:
+            future = self._pending.get(url)
+            if future is None:
+                future = self._executor.submit(self._load, url)
+                future.add_done_callback(lambda _, url=url: self._finish(url))
+                self._pending[url] = future
+            return future
+
+    # (found, content) from memory or the failure list, without blocking
+    def _lookup(self, url):
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                self.memory_hits += 1
+                return True, self._memory[url]
+            if self._failures.get(url, 0) > time.monotonic():
+                return True, None
+        return False, None
+
+    def get_many(self, urls):
+        """
+        Thumbnails of several images, fetched concurrently.
+
+        Parameters:
+        - urls (list): Image URLs, empty or missing values are skipped.
+
+        Returns:
+        - thumbnails (dict): URL -> JPEG bytes, or None if the image could not be fetched.
+        """
+        thumbnails, futures = {}, {}
+        for url in urls:
+            if not isinstance(url, str) or not url or url in thumbnails or url in futures:
+                continue
+            found, content = self._lookup(url)
+            if found:
+                thumbnails[url] = content
+            else:
+                futures[url] = self._submit(url)
+        for url, future in futures.items():
+            thumbnails[url] = future.result()
+        return thumbnails
+
+    def get(self, url):
+        return self.get_many([url]).get(url)
+
+    def prefetch(self, urls):
+        """
+        Starts fetching images in the background without waiting for them.
+        """
+        for url in urls:
+            if not isinstance(url, str) or not url:
+                continue
+            with self._lock:
+                known = url in self._memory or self._failures.get(url, 0) > time.monotonic()
+            if not known:
+                self._submit(url)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'fetches': self.fetches,
+                'failures': self.failures,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()